@@ -1,27 +1,42 @@
 import multiprocessing as mp
-from concurrent.futures import ProcessPoolExecutor
-from typing import List, Tuple
+from itertools import repeat
+from operator import mul
+from typing import Dict, List, Sequence, Tuple
 
 import numpy as np
 
+from TP03.Grupo2.shared_array import SharedArray, SharedArrayHandle, attach
+from TP03.Grupo2.shared_pool import get_pool, warm_up
 from TP03.performance_analyzer.analyzer import PerformanceAnalyzer, PerformanceVisualizer
 
 
-class MatrixMultiplier:
+def _multiply_row(args: Tuple[List[float], List[List[float]], int]) -> Tuple[int, List[float]]:
+    row_a, matrix_b, row_idx = args
+    result = []
+    n = len(matrix_b[0])
 
-    def __init__(self):
-        self.analyzer = PerformanceAnalyzer()
+    for j in range(n):
+        element = sum(row_a[k] * matrix_b[k][j] for k in range(len(row_a)))
+        result.append(element)
+
+    return row_idx, result
+
+
+def _multiply_row_block(a_handle: SharedArrayHandle, b_handle: SharedArrayHandle,
+                        c_handle: SharedArrayHandle, start: int, stop: int) -> None:
+    a_memory, a = attach(a_handle)
+    b_memory, b = attach(b_handle)
+    c_memory, c = attach(c_handle)
+    np.matmul(a[start:stop], b, out=c[start:stop])
+    del a, b, c
+    for memory in (a_memory, b_memory, c_memory):
+        memory.close()
 
-    def _multiply_row(self, args: Tuple[List[float], List[List[float]], int]) -> List[float]:
-        row_a, matrix_b, row_idx = args
-        result = []
-        n = len(matrix_b[0])
 
-        for j in range(n):
-            element = sum(row_a[k] * matrix_b[k][j] for k in range(len(row_a)))
-            result.append(element)
+class MatrixMultiplier:
 
-        return row_idx, result
+    def __init__(self):
+        self.analyzer = PerformanceAnalyzer()
 
     def sequential_multiply(self, matrix_a: List[List[float]],
                             matrix_b: List[List[float]]) -> Tuple[List[List[float]], float]:
@@ -56,8 +71,7 @@ class MatrixMultiplier:
         n = len(matrix_a)
         tasks = [(row, matrix_b, i) for i, row in enumerate(matrix_a)]
 
-        with ProcessPoolExecutor(max_workers=num_processes) as executor:
-            results = list(executor.map(self._multiply_row, tasks))
+        results = list(get_pool(num_processes).map(_multiply_row, tasks))
 
         results.sort(key=lambda x: x[0])
         result_matrix = [row for _, row in results]
@@ -69,6 +83,73 @@ class MatrixMultiplier:
         )
         return result_matrix, metrics.time_taken
 
+    def blocked_multiply(self, matrix_a: List[List[float]],
+                         matrix_b: List[List[float]],
+                         block_size: int = 128) -> Tuple[List[List[float]], float]:
+        """Pure-Python multiply tiled over rows of A, the shared dimension and columns of B.
+
+        B is transposed once so every dot product runs over two contiguous
+        lists. For each tile of A rows and k-range, the row and column slices
+        are cut once and reused across the whole tile, each adding its partial
+        sum into the result.
+        """
+        start_time = self.analyzer.start_operation("blocked")
+
+        if len(matrix_a[0]) != len(matrix_b):
+            raise ValueError("Matrix dimensions don't match for multiplication")
+
+        n, m, p = len(matrix_a), len(matrix_a[0]), len(matrix_b[0])
+        columns_b = [list(column) for column in zip(*matrix_b)]
+        result = [[0.0] * p for _ in range(n)]
+
+        for i0 in range(0, n, block_size):
+            for k0 in range(0, m, block_size):
+                k1 = k0 + block_size
+                rows = [row[k0:k1] for row in matrix_a[i0:i0 + block_size]]
+                for j0 in range(0, p, block_size):
+                    columns = [column[k0:k1] for column in columns_b[j0:j0 + block_size]]
+                    for i, row_a in enumerate(rows, i0):
+                        result_row = result[i]
+                        for j, column in enumerate(columns, j0):
+                            result_row[j] += sum(map(mul, row_a, column))
+
+        metrics = self.analyzer.end_operation(
+            "blocked",
+            start_time,
+            n * m * p
+        )
+        return result, metrics.time_taken
+
+    def shared_memory_multiply(self, matrix_a: List[List[float]],
+                               matrix_b: List[List[float]],
+                               num_processes: int) -> Tuple[List[List[float]], float]:
+        """Split the rows of A into one block per worker over shared-memory buffers.
+
+        A, B and the result are copied into shared memory once per call;
+        tasks carry only handles and a row range instead of a pickled B.
+        """
+        start_time = self.analyzer.start_operation("shared_memory")
+
+        if len(matrix_a[0]) != len(matrix_b):
+            raise ValueError("Matrix dimensions don't match for multiplication")
+
+        n, p = len(matrix_a), len(matrix_b[0])
+        bounds = [n * i // num_processes for i in range(num_processes + 1)]
+        with SharedArray.from_array(matrix_a, dtype=np.float64) as shared_a, \
+                SharedArray.from_array(matrix_b, dtype=np.float64) as shared_b, \
+                SharedArray((n, p), np.float64) as shared_c:
+            list(get_pool(num_processes).map(_multiply_row_block, repeat(shared_a.handle),
+                                             repeat(shared_b.handle), repeat(shared_c.handle),
+                                             bounds[:-1], bounds[1:]))
+            result = shared_c.array.tolist()
+
+        metrics = self.analyzer.end_operation(
+            "shared_memory",
+            start_time,
+            n * len(matrix_b) * p
+        )
+        return result, metrics.time_taken
+
     def numpy_multiply(self, matrix_a: List[List[float]],
                        matrix_b: List[List[float]]) -> Tuple[List[List[float]], float]:
         start_time = self.analyzer.start_operation("numpy")
@@ -121,6 +202,7 @@ def run_matrix_multiplication_analysis(matrix_size: int = 3, iterations: int = 5
     print(f"\nRunning analysis with {num_processes} CPU cores")
     print(f"Matrix size: {matrix_size}x{matrix_size}")
     print(f"Number of iterations: {iterations}")
+    print(f"Shared worker pool startup: {warm_up(num_processes):.4f} seconds (not included below)")
 
     matrix_a = generate_random_matrix(matrix_size, matrix_size)
     matrix_b = generate_random_matrix(matrix_size, matrix_size)
@@ -131,6 +213,8 @@ def run_matrix_multiplication_analysis(matrix_size: int = 3, iterations: int = 5
     methods = {
         "Sequential": lambda: multiplier.sequential_multiply(matrix_a, matrix_b),
         "Parallel": lambda: multiplier.parallel_multiply(matrix_a, matrix_b, num_processes),
+        "Blocked": lambda: multiplier.blocked_multiply(matrix_a, matrix_b),
+        "SharedMemory": lambda: multiplier.shared_memory_multiply(matrix_a, matrix_b, num_processes),
         "NumPy": lambda: multiplier.numpy_multiply(matrix_a, matrix_b)
     }
 
@@ -161,9 +245,57 @@ def run_matrix_multiplication_analysis(matrix_size: int = 3, iterations: int = 5
     return results
 
 
+def run_matrix_size_sweep(sizes: Sequence[int] = (64, 128, 256, 512, 1024, 2048),
+                          python_max_size: int = 256) -> Dict[int, Dict[str, float]]:
+    """Time every engine on square matrices of each size against ``numpy_multiply``.
+
+    The pure-Python engines are cubic in interpreted code and are skipped
+    above ``python_max_size``.
+    """
+    multiplier = MatrixMultiplier()
+    num_processes = mp.cpu_count()
+
+    print(f"\nMatrix size sweep with {num_processes} CPU cores")
+    print(f"Shared worker pool startup: {warm_up(num_processes):.4f} seconds (not included below)")
+    print(f"Pure-Python engines skipped above {python_max_size}x{python_max_size}")
+
+    engines = {
+        "Sequential": (True, lambda a, b: multiplier.sequential_multiply(a, b)),
+        "Parallel": (True, lambda a, b: multiplier.parallel_multiply(a, b, num_processes)),
+        "Blocked": (True, lambda a, b: multiplier.blocked_multiply(a, b)),
+        "SharedMemory": (False, lambda a, b: multiplier.shared_memory_multiply(a, b, num_processes)),
+        "NumPy": (False, lambda a, b: multiplier.numpy_multiply(a, b)),
+    }
+
+    results = {}
+    for size in sizes:
+        matrix_a = np.random.rand(size, size).tolist()
+        matrix_b = np.random.rand(size, size).tolist()
+        expected = np.dot(matrix_a, matrix_b)
+
+        results[size] = {}
+        for method_name, (pure_python, engine) in engines.items():
+            if pure_python and size > python_max_size:
+                continue
+            result_matrix, execution_time = engine(matrix_a, matrix_b)
+            assert np.allclose(result_matrix, expected), f"{method_name} gave a wrong product"
+            results[size][method_name] = execution_time
+
+    print(f"\n{'Size':>6}" + "".join(f"{name:>14}" for name in engines) + f"{'vs NumPy':>24}")
+    for size, times in results.items():
+        cells = "".join(f"{times[name]:>14.4f}" if name in times else f"{'-':>14}" for name in engines)
+        ratios = ", ".join(f"{name} {times[name] / times['NumPy']:.1f}x"
+                           for name in ("Blocked", "SharedMemory") if name in times)
+        print(f"{size:>6}{cells}  {ratios}")
+
+    return results
+
+
 if __name__ == "__main__":
     results_small = run_matrix_multiplication_analysis(matrix_size=3)
 
     results_large = run_matrix_multiplication_analysis(matrix_size=50)
 
+    sweep = run_matrix_size_sweep()
+
     print("\nAnalysis complete! Check the generated visualization files.")
\ No newline at end of file
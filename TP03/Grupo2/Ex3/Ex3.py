@@ -1,5 +1,9 @@
 import math
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from TP03.Grupo2.prime_sieve import SEGMENT_SIZE, odd_primes_up_to, odd_segments, sieve_odd_segment
 from TP03.performance_analyzer.analyzer import PerformanceAnalyzer, PerformanceVisualizer
 
 
@@ -22,26 +26,47 @@ class PrimeCounter:
                 return False
         return True
 
-    def count_primes(self, start: int, end: int) -> Tuple[int, List[int], float]:
-        start_time = self.analyzer.start_operation("count_primes")
-
-        sieve = [True] * (end + 1)
-        sieve[0] = sieve[1] = False
+    def count_primes(self, start: int, end: int, segment_size: int = SEGMENT_SIZE,
+                     count_only: bool = False) -> Tuple[int, List[int], float]:
+        """Segmented odd-only sieve: memory is one segment plus the primes up to sqrt(end).
 
-        for i in range(2, int(math.sqrt(end)) + 1):
-            self.analyzer.record_comparison()
-            if sieve[i]:
-                for j in range(i * i, end + 1, i):
-                    sieve[j] = False
+        With ``count_only`` the primes are counted per segment and never
+        collected, so the returned list is empty.
+        """
+        start_time = self.analyzer.start_operation("count_primes")
 
-        primes = [num for num in range(max(2, start), end + 1) if sieve[num]]
+        base_primes = odd_primes_up_to(math.isqrt(end))
+        count = int(start <= 2 <= end)
+        chunks = [np.array([2], dtype=np.int64)] if count and not count_only else []
+        for low, high in odd_segments(start, end, segment_size):
+            self.analyzer.record_comparisons(len(base_primes))
+            flags = sieve_odd_segment(low, high, base_primes)
+            if count_only:
+                count += int(np.count_nonzero(flags))
+            else:
+                chunks.append(low + 2 * np.flatnonzero(flags))
+
+        primes = np.concatenate(chunks).tolist() if chunks else []
+        if not count_only:
+            count = len(primes)
 
         metrics = self.analyzer.end_operation(
             "count_primes",
             start_time,
             end - start + 1
         )
-        return len(primes), primes, metrics.time_taken
+        return count, primes, metrics.time_taken
+
+    def iter_primes(self, start: int, end: int, segment_size: int = SEGMENT_SIZE) -> Iterator[List[int]]:
+        """Yield the primes in ``[start, end]`` in ascending chunks, one sieve segment at a time."""
+        if start <= 2 <= end:
+            yield [2]
+        base_primes = odd_primes_up_to(math.isqrt(end))
+        for low, high in odd_segments(start, end, segment_size):
+            self.analyzer.record_comparisons(len(base_primes))
+            chunk = low + 2 * np.flatnonzero(sieve_odd_segment(low, high, base_primes))
+            if len(chunk):
+                yield chunk.tolist()
 
     def visualize_performance(self):
         PerformanceVisualizer.create_comparison_plot(
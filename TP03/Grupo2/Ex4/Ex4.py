@@ -1,8 +1,17 @@
+import argparse
 import math
 import multiprocessing as mp
-from concurrent.futures import ProcessPoolExecutor
-from typing import List, Tuple
+import tracemalloc
+from collections import deque
+from concurrent.futures import wait
+from itertools import repeat
+from typing import Iterator, List, Tuple, Union
 
+import numpy as np
+
+from TP03.Grupo2.prime_sieve import SEGMENT_SIZE, odd_primes_up_to, odd_segments, sieve_segment_task
+from TP03.Grupo2.shared_array import SharedArray
+from TP03.Grupo2.shared_pool import get_pool, warm_up
 from TP03.performance_analyzer.analyzer import PerformanceAnalyzer, PerformanceVisualizer
 
 
@@ -25,43 +34,117 @@ class PrimeCounter:
                 return False
         return True
 
-    def sequential_count(self, start: int, end: int) -> Tuple[int, List[int], float]:
+    def sequential_count(self, start: int, end: int,
+                         count_only: bool = False) -> Tuple[int, List[int], float]:
         start_time = self.analyzer.start_operation("sequential")
         primes = []
+        count = 0
 
         for num in range(start, end + 1):
             if self.is_prime(num):
-                primes.append(num)
+                if count_only:
+                    count += 1
+                else:
+                    primes.append(num)
 
         metrics = self.analyzer.end_operation(
             "sequential",
             start_time,
             end - start + 1
         )
-        return len(primes), primes, metrics.time_taken
-
-    def _process_range(self, range_tuple: Tuple[int, int]) -> List[int]:
-        start, end = range_tuple
-        return [num for num in range(start, end + 1) if self.is_prime(num)]
+        return count if count_only else len(primes), primes, metrics.time_taken
 
-    def parallel_count(self, start: int, end: int, num_processes: int) -> Tuple[int, List[int], float]:
+    def parallel_count(self, start: int, end: int, num_processes: int,
+                       count_only: bool = False) -> Tuple[int, List[int], float]:
+        """Trial division over many small ranges; ``count_only`` workers send back one int each."""
         start_time = self.analyzer.start_operation("parallel")
 
-        chunk_size = (end - start + 1) // num_processes
+        # Many small ranges rather than one per worker: trial division gets
+        # slower towards the end, so equal shares would leave the last one behind.
+        chunk_size = max(1, (end - start + 1) // (num_processes * 16))
         ranges = [(i, min(i + chunk_size - 1, end))
                   for i in range(start, end + 1, chunk_size)]
 
-        with ProcessPoolExecutor(max_workers=num_processes) as executor:
-            results = list(executor.map(self._process_range, ranges))
+        results = list(get_pool(num_processes).map(_process_range, ranges, repeat(count_only)))
 
-        all_primes = [prime for chunk in results for prime in chunk]
+        if count_only:
+            count, all_primes = sum(results), []
+        else:
+            all_primes = sorted(prime for chunk in results for prime in chunk)
+            count = len(all_primes)
 
         metrics = self.analyzer.end_operation(
             "parallel",
             start_time,
             end - start + 1
         )
-        return len(all_primes), sorted(all_primes), metrics.time_taken
+        return count, all_primes, metrics.time_taken
+
+    def segmented_sieve_count(self, start: int, end: int, num_processes: int,
+                              segment_size: int = SEGMENT_SIZE,
+                              count_only: bool = False) -> Tuple[int, List[int], float]:
+        """Parallel segmented sieve over odd numbers, sharing the base primes.
+
+        The primes up to sqrt(end) are placed once in shared memory and each
+        pool task sieves one segment against them. With ``count_only`` the
+        workers return a count per segment and the primes list is empty,
+        so memory stays bounded at a segment per worker whatever ``end`` is.
+        """
+        start_time = self.analyzer.start_operation("segmented_sieve")
+
+        segments = odd_segments(start, end, segment_size)
+        with SharedArray.from_array(odd_primes_up_to(math.isqrt(end))) as base_primes:
+            results = list(get_pool(num_processes).map(
+                sieve_segment_task, repeat(base_primes.handle),
+                [low for low, _ in segments], [high for _, high in segments], repeat(count_only)))
+
+        has_two = start <= 2 <= end
+        if count_only:
+            count = sum(results) + has_two
+            primes = []
+        else:
+            chunks = ([np.array([2], dtype=np.int64)] if has_two else []) + results
+            primes = np.concatenate(chunks).tolist() if chunks else []
+            count = len(primes)
+
+        metrics = self.analyzer.end_operation(
+            "segmented_sieve",
+            start_time,
+            end - start + 1
+        )
+        return count, primes, metrics.time_taken
+
+    def iter_primes(self, start: int, end: int, num_processes: int,
+                    segment_size: int = SEGMENT_SIZE) -> Iterator[List[int]]:
+        """Stream the primes in ``[start, end]`` as ascending per-segment chunks.
+
+        Segments are sieved in the pool with at most two per worker in
+        flight, so a slow consumer holds back the workers instead of
+        letting finished chunks pile up.
+        """
+        if start <= 2 <= end:
+            yield [2]
+
+        pool = get_pool(num_processes)
+        pending = deque()
+        with SharedArray.from_array(odd_primes_up_to(math.isqrt(end))) as base_primes:
+            try:
+                for low, high in odd_segments(start, end, segment_size):
+                    pending.append(pool.submit(sieve_segment_task, base_primes.handle, low, high, False))
+                    if len(pending) >= 2 * num_processes:
+                        chunk = pending.popleft().result()
+                        if len(chunk):
+                            yield chunk.tolist()
+                while pending:
+                    chunk = pending.popleft().result()
+                    if len(chunk):
+                        yield chunk.tolist()
+            finally:
+                for future in pending:
+                    future.cancel()
+                # Tasks already running cannot be cancelled and may still be
+                # attaching to the base primes; unlink them only once they finish.
+                wait(pending)
 
     def visualize_comparison(self):
         PerformanceVisualizer.create_comparison_plot(
@@ -83,6 +166,30 @@ class PrimeCounter:
         )
 
 
+def is_prime(n: int) -> bool:
+    """``PrimeCounter.is_prime`` without the comparison counting, for pool workers."""
+    if n < 2:
+        return False
+    if n == 2:
+        return True
+    if n % 2 == 0:
+        return False
+
+    for i in range(3, int(math.sqrt(n)) + 1, 2):
+        if n % i == 0:
+            return False
+    return True
+
+
+def _process_range(range_tuple: Tuple[int, int], count_only: bool = False) -> Union[int, List[int]]:
+    # Runs in a pool worker, where comparison counts would stay in that
+    # process anyway, so it skips the instrumented PrimeCounter.
+    start, end = range_tuple
+    if count_only:
+        return sum(1 for num in range(start, end + 1) if is_prime(num))
+    return [num for num in range(start, end + 1) if is_prime(num)]
+
+
 def run_performance_comparison(end: int = 100_000, iterations: int = 3):
     counter = PrimeCounter()
     num_processes = mp.cpu_count()
@@ -92,10 +199,12 @@ def run_performance_comparison(end: int = 100_000, iterations: int = 3):
     print(f"Range: {start:,} to {end:,}")
     print(f"Number of CPU cores available: {num_processes}")
     print(f"Number of iterations: {iterations}")
+    print(f"Shared worker pool startup: {warm_up(num_processes):.4f} seconds (not included below)")
 
     results = {
         "Sequential": [],
-        "Parallel": []
+        "Parallel": [],
+        "SegmentedSieve": []
     }
 
     for i in range(iterations):
@@ -115,8 +224,15 @@ def run_performance_comparison(end: int = 100_000, iterations: int = 3):
         })
         print(f"Parallel: {par_time:.4f} seconds")
 
-        assert seq_count == par_count, "Error: Methods found different number of primes"
-        assert seq_primes == par_primes, "Error: Methods found different prime numbers"
+        sieve_count, sieve_primes, sieve_time = counter.segmented_sieve_count(start, end, num_processes)
+        results["SegmentedSieve"].append({
+            "count": sieve_count,
+            "time": sieve_time
+        })
+        print(f"Segmented sieve: {sieve_time:.4f} seconds")
+
+        assert seq_count == par_count == sieve_count, "Error: Methods found different number of primes"
+        assert seq_primes == par_primes == sieve_primes, "Error: Methods found different prime numbers"
 
     print("\nPerformance Statistics:")
     for method in results:
@@ -136,9 +252,78 @@ def run_performance_comparison(end: int = 100_000, iterations: int = 3):
     return results
 
 
+def run_sieve_scaling(limits: Tuple[int, ...] = (10 ** 6, 10 ** 7, 10 ** 8)):
+    """Count primes up to each limit with the parallel segmented sieve in count-only mode."""
+    counter = PrimeCounter()
+    num_processes = mp.cpu_count()
+
+    print(f"\nSegmented sieve scaling on {num_processes} CPU cores")
+    print(f"Shared worker pool startup: {warm_up(num_processes):.4f} seconds (not included below)")
+
+    results = {}
+    for limit in limits:
+        count, _, execution_time = counter.segmented_sieve_count(1, limit, num_processes, count_only=True)
+        results[limit] = {"count": count, "time": execution_time}
+        print(f"pi({limit:.0e}) = {count:,} in {execution_time:.2f} seconds")
+
+    return results
+
+
+def run_output_mode_comparison(end: int = 10_000_000):
+    """Time and peak parent memory of the three ways to get primes out of the sieve.
+
+    Each mode runs twice: timed without tracing, then under tracemalloc for
+    the peak, since tracing every int of the full list would distort the time.
+    """
+    counter = PrimeCounter()
+    num_processes = mp.cpu_count()
+
+    print(f"\nOutput modes for primes up to {end:,} on {num_processes} CPU cores")
+    print(f"Shared worker pool startup: {warm_up(num_processes):.4f} seconds (not included below)")
+
+    def full_list():
+        return counter.segmented_sieve_count(1, end, num_processes)[0]
+
+    def count_only():
+        return counter.segmented_sieve_count(1, end, num_processes, count_only=True)[0]
+
+    def streaming():
+        return sum(len(chunk) for chunk in counter.iter_primes(1, end, num_processes))
+
+    results = {}
+    for mode, run in (("full list", full_list), ("count_only", count_only), ("streaming", streaming)):
+        start_time = counter.analyzer.start_operation(mode)
+        count = run()
+        execution_time = counter.analyzer.end_operation(mode, start_time, end).time_taken
+
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[mode] = {"count": count, "time": execution_time, "peak_mib": peak / 2 ** 20}
+        print(f"{mode:<12} {count:>12,} primes  {execution_time:>8.2f} seconds  {peak / 2 ** 20:>10.1f} MiB peak")
+
+    assert len({result["count"] for result in results.values()}) == 1, "Output modes disagree"
+    return results
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prime counting benchmarks.")
+    parser.add_argument("--max-limit", type=float, default=1e8,
+                        help="largest limit of the sieve scaling run, e.g. 1e10 (default: 1e8)")
+    parser.add_argument("--output-mode-end", type=float, default=1e7,
+                        help="upper bound of the output-mode comparison (default: 1e7)")
+    args = parser.parse_args()
+
     results = run_performance_comparison()
 
     results_large = run_performance_comparison(end=500_000, iterations=2)
 
+    max_limit = int(args.max_limit)
+    limits = sorted({10 ** e for e in range(6, 20) if 10 ** e < max_limit} | {max_limit})
+    sieve_results = run_sieve_scaling(tuple(limits))
+
+    mode_results = run_output_mode_comparison(int(args.output_mode_end))
+
     print("\nAnalysis complete! Check the generated visualization files.")
\ No newline at end of file
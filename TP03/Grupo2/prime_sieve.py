@@ -0,0 +1,65 @@
+from math import isqrt
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from TP03.Grupo2.shared_array import SharedArrayHandle, attach
+
+# Odd numbers per segment: a 1 MiB flag array covering 2M integers.
+SEGMENT_SIZE = 1 << 20
+
+
+def odd_primes_up_to(limit: int) -> np.ndarray:
+    """Odd primes <= ``limit`` from a plain odd-only sieve; index ``i`` stands for ``2i + 3``."""
+    if limit < 3:
+        return np.empty(0, dtype=np.int64)
+    flags = np.ones((limit - 1) // 2, dtype=bool)
+    for i in range((isqrt(limit) - 1) // 2):
+        if flags[i]:
+            p = 2 * i + 3
+            flags[(p * p - 3) // 2::p] = False
+    return 2 * np.flatnonzero(flags).astype(np.int64) + 3
+
+
+def odd_segments(start: int, end: int, segment_size: int = SEGMENT_SIZE) -> List[Tuple[int, int]]:
+    """Split the odd numbers of ``[start, end]`` into ``[low, high)`` ranges with ``low`` odd."""
+    low = max(start, 1) | 1
+    span = 2 * segment_size
+    return [(segment_low, min(segment_low + span, end + 1)) for segment_low in range(low, end + 1, span)]
+
+
+def sieve_odd_segment(low: int, high: int, base_primes: np.ndarray) -> np.ndarray:
+    """Primality flags for the odd numbers ``low, low + 2, ...`` below ``high``.
+
+    ``base_primes`` must hold every odd prime up to ``isqrt(high - 1)``.
+    """
+    flags = np.ones((high - low + 1) // 2, dtype=bool)
+    if low == 1:
+        flags[0] = False
+    for p in base_primes.tolist():
+        first = p * p
+        if first >= high:
+            break
+        if first < low:
+            first = (low + p - 1) // p * p
+            if not first & 1:
+                first += p
+        flags[(first - low) // 2::p] = False
+    return flags
+
+
+def sieve_segment_task(handle: SharedArrayHandle, low: int, high: int,
+                       count_only: bool) -> Union[int, np.ndarray]:
+    """Pool worker: sieve one segment against the shared base primes.
+
+    Returns the number of primes in it, or the primes themselves as an
+    int64 array; either way nothing but the result crosses the process
+    boundary.
+    """
+    memory, base_primes = attach(handle)
+    flags = sieve_odd_segment(low, high, base_primes)
+    del base_primes
+    memory.close()
+    if count_only:
+        return int(np.count_nonzero(flags))
+    return low + 2 * np.flatnonzero(flags)
@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SharedArrayHandle:
+    """Picklable reference to a ``SharedArray``; this is all a worker receives."""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedArray:
+    """NumPy array placed once in ``multiprocessing.shared_memory``.
+
+    The owning process creates and fills it; workers get the small
+    ``handle`` and map the same buffer with ``attach``, so the elements are
+    never pickled or copied between processes.
+    """
+
+    def __init__(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self._memory = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._memory.buf)
+        self.handle = SharedArrayHandle(self._memory.name, tuple(self.array.shape), dtype.str)
+
+    @classmethod
+    def from_array(cls, data, dtype=None) -> 'SharedArray':
+        data = np.asarray(data, dtype=dtype)
+        shared = cls(data.shape, data.dtype)
+        shared.array[...] = data
+        return shared
+
+    def close(self) -> None:
+        """Release and destroy the segment; views of ``array`` must be dropped first."""
+        if self._memory is None:
+            return
+        del self.array
+        self._memory.close()
+        self._memory.unlink()
+        self._memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def attach(handle: SharedArrayHandle) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Map a shared array inside a worker.
+
+    Drop the returned array (and any views of it) before calling
+    ``close()`` on the returned segment.
+    """
+    memory = shared_memory.SharedMemory(name=handle.name)
+    return memory, np.ndarray(handle.shape, dtype=handle.dtype, buffer=memory.buf)
@@ -0,0 +1,54 @@
+import atexit
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from typing import Dict, Optional
+
+# Process pools shared by every Grupo2 analyzer, one per worker count. Each is
+# started on first use and kept alive, so parallel calls only pay for
+# pickling their tasks; spawning the workers is measured once by ``warm_up``.
+# Keeping a pool per size means a call asking for 2 workers runs on 2 even
+# after another one started 8, so process-count sweeps measure what they say.
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def get_pool(num_processes: Optional[int] = None) -> ProcessPoolExecutor:
+    """Return the shared pool with exactly ``num_processes`` workers, starting it if needed."""
+    num_processes = num_processes or mp.cpu_count()
+    with _lock:
+        pool = _pools.get(num_processes)
+        if pool is None:
+            # Started first so the workers share this process's resource tracker;
+            # otherwise each one reports the shared memory it attached as leaked.
+            resource_tracker.ensure_running()
+            pool = _pools[num_processes] = ProcessPoolExecutor(max_workers=num_processes)
+        return pool
+
+
+def warm_up(num_processes: Optional[int] = None) -> float:
+    """Start the shared pool of that size and wait until every worker answers; returns the seconds spent."""
+    num_processes = num_processes or mp.cpu_count()
+    start = time.perf_counter()
+    pool = get_pool(num_processes)
+    for future in [pool.submit(_worker_ready) for _ in range(num_processes)]:
+        future.result()
+    return time.perf_counter() - start
+
+
+def shutdown() -> None:
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+atexit.register(shutdown)
@@ -27,7 +27,7 @@ class ParallelSearchBST(BinarySearchTree):
         with ThreadPoolExecutor(max_workers=2) as executor:
             if value < self.root.value and self.root.left:
                 left_future = executor.submit(
-                    self._parallel_search_recursive,
+                    self.analyzer.bind(self._parallel_search_recursive),
                     self.root.left,
                     value,
                     shared_path,
@@ -36,7 +36,7 @@ class ParallelSearchBST(BinarySearchTree):
 
             if value > self.root.value and self.root.right:
                 right_future = executor.submit(
-                    self._parallel_search_recursive,
+                    self.analyzer.bind(self._parallel_search_recursive),
                     self.root.right,
                     value,
                     shared_path,
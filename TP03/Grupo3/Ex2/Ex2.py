@@ -55,7 +55,7 @@ class ParallelDFSTree(BinarySearchTree):
 
             if self.root.left:
                 futures.append(executor.submit(
-                    self._parallel_dfs_recursive,
+                    self.analyzer.bind(self._parallel_dfs_recursive),
                     self.root.left,
                     target,
                     [self.root.value]
@@ -63,7 +63,7 @@ class ParallelDFSTree(BinarySearchTree):
 
             if self.root.right:
                 futures.append(executor.submit(
-                    self._parallel_dfs_recursive,
+                    self.analyzer.bind(self._parallel_dfs_recursive),
                     self.root.right,
                     target,
                     [self.root.value]
@@ -69,7 +69,7 @@ class ParallelMaxFinder(BinarySearchTree):
 
                 if current.left:
                     futures.append(executor.submit(
-                        self._find_subtree_max,
+                        self.analyzer.bind(self._find_subtree_max),
                         current.left,
                         [0]
                     ))
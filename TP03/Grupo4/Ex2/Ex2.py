@@ -1,8 +1,9 @@
 import ipaddress
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Union
 
 from matplotlib import pyplot as plt
 
+from TP03.Trie.trie import ip_to_int
 from TP03.performance_analyzer.analyzer import PerformanceAnalyzer, PerformanceVisualizer
 from TP03.performance_analyzer.decorators import measure_performance
 
@@ -23,32 +24,31 @@ class IPv4Trie:
         self.analyzer = PerformanceAnalyzer()
         self.search_paths: List[Dict] = []
 
-    def _ip_to_binary(self, ip: str) -> str:
-        ip_int = int(ipaddress.IPv4Address(ip))
-        return format(ip_int, '032b')
+    def _ip_to_int(self, ip) -> int:
+        value, bits = ip_to_int(ip)
+        if bits != 32:
+            raise ValueError(f"{ip!r} is not an IPv4 address")
+        return value
 
-    def _get_network_and_mask(self, prefix: str) -> Tuple[str, int, str]:
+    def _get_network_and_mask(self, prefix: str) -> Tuple[str, int, int]:
         network = ipaddress.IPv4Network(prefix, strict=False)
         network_addr = str(network.network_address)
         mask_length = network.prefixlen
-        binary_ip = self._ip_to_binary(network_addr)
-        return network_addr, mask_length, binary_ip
+        return network_addr, mask_length, int(network.network_address)
 
     @measure_performance("insert")
     def insert(self, prefix: str) -> None:
         try:
-            network_addr, mask_length, binary_ip = self._get_network_and_mask(prefix)
+            network_addr, mask_length, network_int = self._get_network_and_mask(prefix)
         except ValueError as e:
             print(f"Invalid prefix {prefix}: {e}")
             return
 
         current = self.root
-        prefix_bits = ""
 
-        for i in range(mask_length):
+        for shift in range(31, 31 - mask_length, -1):
             self.analyzer.record_comparison()
-            bit = int(binary_ip[i])
-            prefix_bits += str(bit)
+            bit = (network_int >> shift) & 1
 
             if bit not in current.children:
                 current.children[bit] = IPv4TrieNode()
@@ -57,23 +57,73 @@ class IPv4Trie:
         current.is_end = True
         current.prefix = prefix
         current.mask_length = mask_length
-        current.prefix_bits = prefix_bits
+        current.prefix_bits = format(network_int >> (32 - mask_length), f'0{mask_length}b') if mask_length else ""
 
         self.analyzer.end_operation(
             "insert",
-            time.time(),
+            self.analyzer.start_operation("insert"),
             mask_length,
             {"prefix": prefix, "mask_length": mask_length}
         )
 
+    @measure_performance("delete")
+    def delete(self, prefix: str) -> bool:
+        try:
+            network_addr, mask_length, network_int = self._get_network_and_mask(prefix)
+        except ValueError as e:
+            print(f"Invalid prefix {prefix}: {e}")
+            return False
+
+        path = [self.root]
+        for shift in range(31, 31 - mask_length, -1):
+            self.analyzer.record_comparison()
+            child = path[-1].children.get((network_int >> shift) & 1)
+            if child is None:
+                return False
+            path.append(child)
+
+        node = path[-1]
+        if not node.is_end:
+            return False
+        node.is_end = False
+        node.prefix = None
+        node.mask_length = None
+        node.prefix_bits = None
+
+        # Drop the nodes that no longer lead to any prefix.
+        for depth in range(mask_length, 0, -1):
+            if path[depth].is_end or path[depth].children:
+                break
+            del path[depth - 1].children[(network_int >> (32 - depth)) & 1]
+        return True
+
     @measure_performance("longest_prefix_match")
-    def longest_prefix_match(self, ip: str) -> Tuple[Optional[str], List[Dict]]:
+    def longest_prefix_match(self, ip: str, trace: bool = False) -> Union[Optional[str], Tuple[Optional[str], List[Dict]]]:
+        """Return the longest matching prefix, or ``(prefix, search_path)`` with ``trace=True``."""
         try:
-            binary_ip = self._ip_to_binary(ip)
+            ip_int = self._ip_to_int(ip)
         except ValueError as e:
             print(f"Invalid IP {ip}: {e}")
-            return None, []
+            return (None, []) if trace else None
+
+        if trace:
+            return self._traced_match(ip_int)
+
+        current = self.root
+        matched_prefix = None
+        shift = 32
+        while current is not None:
+            if current.is_end:
+                matched_prefix = current.prefix
+            shift -= 1
+            if shift < 0:
+                break
+            current = current.children.get((ip_int >> shift) & 1)
+
+        self.analyzer.record_comparisons(32 - max(shift, 0))
+        return matched_prefix
 
+    def _traced_match(self, ip_int: int) -> Tuple[Optional[str], List[Dict]]:
         current = self.root
         matched_prefix = None
         search_path = []
@@ -93,7 +143,7 @@ class IPv4Trie:
             if current.is_end:
                 matched_prefix = current.prefix
 
-            bit = int(binary_ip[i])
+            bit = (ip_int >> (31 - i)) & 1
             current_bits += str(bit)
 
             if bit not in current.children:
@@ -103,7 +153,7 @@ class IPv4Trie:
         if current.is_end:
             matched_prefix = current.prefix
             search_path.append({
-                'level': len(binary_ip),
+                'level': 32,
                 'bits_seen': current_bits,
                 'current_match': matched_prefix,
                 'is_prefix': True
@@ -170,7 +220,7 @@ def test_ipv4_longest_prefix_match():
     print("\nTesting longest prefix matches:")
     for ip in test_ips:
         print(f"\nLooking up IP: {ip}")
-        matched_prefix, search_path = trie.longest_prefix_match(ip)
+        matched_prefix, search_path = trie.longest_prefix_match(ip, trace=True)
 
         print(f"Matched prefix: {matched_prefix}")
         print("Search path:")
@@ -193,8 +243,7 @@ def test_ipv4_longest_prefix_match():
 
     for invalid_ip in error_cases:
         print(f"\nTesting invalid IP: {invalid_ip}")
-        matched_prefix, search_path = trie.longest_prefix_match(invalid_ip)
-        print(f"Result: {matched_prefix}")
+        print(f"Result: {trie.longest_prefix_match(invalid_ip)}")
 
     print("\nGenerating performance visualizations...")
     trie.visualize_performance()
@@ -1,5 +1,6 @@
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Union
 import ipaddress
+from TP03.Trie.trie import ip_to_int
 from TP03.performance_analyzer.analyzer import PerformanceAnalyzer, PerformanceVisualizer
 from TP03.performance_analyzer.decorators import measure_performance
 
@@ -20,16 +21,17 @@ class IPv6Trie:
         self.analyzer = PerformanceAnalyzer()
         self.search_paths: List[Dict] = []
 
-    def _ip_to_binary(self, ip: str) -> str:
-        ip_int = int(ipaddress.IPv6Address(ip))
-        return format(ip_int, '0128b')
+    def _ip_to_int(self, ip) -> int:
+        value, bits = ip_to_int(ip)
+        if bits != 128:
+            raise ValueError(f"{ip!r} is not an IPv6 address")
+        return value
 
-    def _get_network_and_mask(self, prefix: str) -> Tuple[str, int, str]:
+    def _get_network_and_mask(self, prefix: str) -> Tuple[str, int, int]:
         network = ipaddress.IPv6Network(prefix, strict=False)
         network_addr = str(network.network_address)
         mask_length = network.prefixlen
-        binary_ip = self._ip_to_binary(network_addr)
-        return network_addr, mask_length, binary_ip
+        return network_addr, mask_length, int(network.network_address)
 
     def _format_prefix_bits(self, bits: str) -> str:
         groups = [bits[i:i + 16] for i in range(0, len(bits), 16)]
@@ -38,18 +40,16 @@ class IPv6Trie:
     @measure_performance("insert")
     def insert(self, prefix: str) -> None:
         try:
-            network_addr, mask_length, binary_ip = self._get_network_and_mask(prefix)
+            network_addr, mask_length, network_int = self._get_network_and_mask(prefix)
         except ValueError as e:
             print(f"Invalid IPv6 prefix {prefix}: {e}")
             return
 
         current = self.root
-        prefix_bits = ""
 
-        for i in range(mask_length):
+        for shift in range(127, 127 - mask_length, -1):
             self.analyzer.record_comparison()
-            bit = int(binary_ip[i])
-            prefix_bits += str(bit)
+            bit = (network_int >> shift) & 1
 
             if bit not in current.children:
                 current.children[bit] = IPTrieNode()
@@ -58,7 +58,7 @@ class IPv6Trie:
         current.is_end = True
         current.prefix = prefix
         current.mask_length = mask_length
-        current.prefix_bits = prefix_bits
+        current.prefix_bits = format(network_int >> (128 - mask_length), f'0{mask_length}b') if mask_length else ""
         current.version = 6
 
         self.analyzer.end_operation(
@@ -68,14 +68,65 @@ class IPv6Trie:
             {"prefix": prefix, "mask_length": mask_length}
         )
 
+    @measure_performance("delete")
+    def delete(self, prefix: str) -> bool:
+        try:
+            network_addr, mask_length, network_int = self._get_network_and_mask(prefix)
+        except ValueError as e:
+            print(f"Invalid IPv6 prefix {prefix}: {e}")
+            return False
+
+        path = [self.root]
+        for shift in range(127, 127 - mask_length, -1):
+            self.analyzer.record_comparison()
+            child = path[-1].children.get((network_int >> shift) & 1)
+            if child is None:
+                return False
+            path.append(child)
+
+        node = path[-1]
+        if not node.is_end:
+            return False
+        node.is_end = False
+        node.prefix = None
+        node.mask_length = None
+        node.prefix_bits = None
+        node.version = None
+
+        # Drop the nodes that no longer lead to any prefix.
+        for depth in range(mask_length, 0, -1):
+            if path[depth].is_end or path[depth].children:
+                break
+            del path[depth - 1].children[(network_int >> (128 - depth)) & 1]
+        return True
+
     @measure_performance("longest_prefix_match")
-    def longest_prefix_match(self, ip: str) -> Tuple[Optional[str], List[Dict]]:
+    def longest_prefix_match(self, ip: str, trace: bool = False) -> Union[Optional[str], Tuple[Optional[str], List[Dict]]]:
+        """Return the longest matching prefix, or ``(prefix, search_path)`` with ``trace=True``."""
         try:
-            binary_ip = self._ip_to_binary(ip)
+            ip_int = self._ip_to_int(ip)
         except ValueError as e:
             print(f"Invalid IPv6 address {ip}: {e}")
-            return None, []
+            return (None, []) if trace else None
+
+        if trace:
+            return self._traced_match(ip_int)
+
+        current = self.root
+        matched_prefix = None
+        shift = 128
+        while current is not None:
+            if current.is_end:
+                matched_prefix = current.prefix
+            shift -= 1
+            if shift < 0:
+                break
+            current = current.children.get((ip_int >> shift) & 1)
+
+        self.analyzer.record_comparisons(128 - max(shift, 0))
+        return matched_prefix
 
+    def _traced_match(self, ip_int: int) -> Tuple[Optional[str], List[Dict]]:
         current = self.root
         matched_prefix = None
         search_path = []
@@ -95,7 +146,7 @@ class IPv6Trie:
             if current.is_end:
                 matched_prefix = current.prefix
 
-            bit = int(binary_ip[i])
+            bit = (ip_int >> (127 - i)) & 1
             current_bits += str(bit)
 
             if bit not in current.children:
@@ -105,7 +156,7 @@ class IPv6Trie:
         if current.is_end:
             matched_prefix = current.prefix
             search_path.append({
-                'level': len(binary_ip),
+                'level': 128,
                 'bits_seen': self._format_prefix_bits(current_bits),
                 'current_match': matched_prefix,
                 'is_prefix': True
@@ -162,7 +213,7 @@ def test_ipv6_prefix_matching():
     print("\nTesting longest prefix matches:")
     for ip in test_ips:
         print(f"\nLooking up IP: {ip}")
-        matched_prefix, search_path = trie.longest_prefix_match(ip)
+        matched_prefix, search_path = trie.longest_prefix_match(ip, trace=True)
 
         print(f"Matched prefix: {matched_prefix}")
         print("Search path:")
@@ -186,8 +237,7 @@ def test_ipv6_prefix_matching():
 
     for invalid_ip in error_cases:
         print(f"\nTesting invalid IP: {invalid_ip}")
-        matched_prefix, search_path = trie.longest_prefix_match(invalid_ip)
-        print(f"Result: {matched_prefix}")
+        print(f"Result: {trie.longest_prefix_match(invalid_ip)}")
 
     print("\nGenerating performance visualizations...")
     trie.visualize_performance()
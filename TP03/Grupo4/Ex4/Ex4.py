@@ -1,9 +1,12 @@
 import ipaddress
 import random
 import time
+from bisect import bisect_right
 from typing import List, Optional, Dict
 
 import matplotlib.pyplot as plt
+from TP03.Trie.interval_index import IntervalIndex
+from TP03.Trie.trie import ip_to_int
 from TP03.performance_analyzer.analyzer import PerformanceAnalyzer
 from TP03.performance_analyzer.decorators import measure_performance
 
@@ -21,21 +24,23 @@ class IPv4Trie:
         self.root = IPv4TrieNode()
         self.analyzer = PerformanceAnalyzer()
 
-    def _ip_to_binary(self, ip: str) -> str:
-        ip_obj = ipaddress.IPv4Address(ip)
-        return format(int(ip_obj), '032b')
+    def _ip_to_int(self, ip) -> int:
+        value, bits = ip_to_int(ip)
+        if bits != 32:
+            raise ValueError(f"{ip!r} is not an IPv4 address")
+        return value
 
     @measure_performance("insert")
     def insert(self, prefix: str) -> None:
         try:
             network = ipaddress.IPv4Network(prefix, strict=False)
-            binary_ip = format(int(network.network_address), '032b')
+            network_int = int(network.network_address)
             mask_length = network.prefixlen
 
             current = self.root
-            for i in range(mask_length):
+            for shift in range(31, 31 - mask_length, -1):
                 self.analyzer.record_comparison()
-                bit = int(binary_ip[i])
+                bit = (network_int >> shift) & 1
                 if current.children[bit] is None:
                     current.children[bit] = IPv4TrieNode()
                 current = current.children[bit]
@@ -46,21 +51,51 @@ class IPv4Trie:
         except ValueError:
             return
 
+    @measure_performance("delete")
+    def delete(self, prefix: str) -> bool:
+        try:
+            network = ipaddress.IPv4Network(prefix, strict=False)
+        except ValueError:
+            return False
+        network_int = int(network.network_address)
+        mask_length = network.prefixlen
+
+        path = [self.root]
+        for shift in range(31, 31 - mask_length, -1):
+            self.analyzer.record_comparison()
+            child = path[-1].children[(network_int >> shift) & 1]
+            if child is None:
+                return False
+            path.append(child)
+
+        node = path[-1]
+        if node.prefix is None:
+            return False
+        node.prefix = None
+        node.network = None
+        node.mask_length = None
+
+        for depth in range(mask_length, 0, -1):
+            node = path[depth]
+            if node.prefix is not None or node.children[0] is not None or node.children[1] is not None:
+                break
+            path[depth - 1].children[(network_int >> (32 - depth)) & 1] = None
+        return True
+
     @measure_performance("search")
     def search(self, ip: str) -> Optional[str]:
         try:
-            ip_obj = ipaddress.IPv4Address(ip)
-            binary_ip = self._ip_to_binary(str(ip_obj))
+            ip_int = self._ip_to_int(ip)
 
             current = self.root
             best_match = None
 
-            for i in range(len(binary_ip)):
+            for shift in range(31, -1, -1):
                 self.analyzer.record_comparison()
                 if current.prefix is not None:
                     best_match = current.prefix
 
-                bit = int(binary_ip[i])
+                bit = (ip_int >> shift) & 1
                 if current.children[bit] is None:
                     break
                 current = current.children[bit]
@@ -78,6 +113,7 @@ class PrefixSearchComparator:
         self.analyzer = PerformanceAnalyzer()
         self.trie = IPv4Trie()
         self.prefix_list: List[str] = []
+        self.interval_index: Optional[IntervalIndex] = None
 
     def generate_random_prefix(self) -> str:
         octet1 = random.randint(1, 223)
@@ -100,8 +136,20 @@ class PrefixSearchComparator:
         self.prefix_list = list(prefixes)
         for prefix in self.prefix_list:
             self.trie.insert(prefix)
+        self.interval_index = self.build_interval_index()
         return self.prefix_list
 
+    def build_interval_index(self) -> IntervalIndex:
+        # Several strings can name the same network; like linear_search, the
+        # first one in prefix_list wins.
+        networks = {}
+        for prefix_id, prefix in enumerate(self.prefix_list):
+            network = ipaddress.IPv4Network(prefix, strict=False)
+            networks.setdefault((int(network.network_address), network.prefixlen), prefix_id)
+        return IntervalIndex.from_prefixes(
+            [(network, length, prefix_id) for (network, length), prefix_id in networks.items()], 32
+        )
+
     @measure_performance("linear_search")
     def linear_search(self, ip: str) -> Optional[str]:
         try:
@@ -125,6 +173,22 @@ class PrefixSearchComparator:
     def trie_search(self, ip: str) -> Optional[str]:
         return self.trie.search(ip)
 
+    @measure_performance("interval_search")
+    def interval_search(self, ip: str) -> Optional[str]:
+        try:
+            value, bits = ip_to_int(ip)
+        except ValueError:
+            return None
+        if bits != 32:
+            return None
+
+        if self.interval_index is None:
+            self.interval_index = self.build_interval_index()
+        starts = self.interval_index.starts
+        self.analyzer.record_comparisons(len(starts).bit_length())
+        prefix_id = self.interval_index.ids[bisect_right(starts, value) - 1]
+        return self.prefix_list[prefix_id] if prefix_id >= 0 else None
+
     def run_performance_comparison(self, num_prefixes: int, num_tests: int) -> Dict:
         print(f"\nGenerating {num_prefixes} random prefixes...")
         prefixes = self.generate_test_data(num_prefixes)
@@ -139,7 +203,8 @@ class PrefixSearchComparator:
         print(f"\nRunning {num_tests} test searches...")
         results = {
             'linear': {'times': [], 'comparisons': []},
-            'trie': {'times': [], 'comparisons': []}
+            'trie': {'times': [], 'comparisons': []},
+            'interval': {'times': [], 'comparisons': []}
         }
 
         for i, ip in enumerate(test_ips, 1):
@@ -155,10 +220,17 @@ class PrefixSearchComparator:
             trie_time = time.time() - start_time
             results['trie']['times'].append(trie_time)
 
+            start_time = time.time()
+            self.interval_search(ip)
+            interval_time = time.time() - start_time
+            results['interval']['times'].append(interval_time)
+
             linear_metrics = [m for m in self.analyzer.metrics_history if m.operation == "linear_search"][-1]
             trie_metrics = [m for m in self.analyzer.metrics_history if m.operation == "trie_search"][-1]
+            interval_metrics = [m for m in self.analyzer.metrics_history if m.operation == "interval_search"][-1]
             results['linear']['comparisons'].append(linear_metrics.comparisons)
             results['trie']['comparisons'].append(trie_metrics.comparisons)
+            results['interval']['comparisons'].append(interval_metrics.comparisons)
 
         return results
 
@@ -168,6 +240,7 @@ class PrefixSearchComparator:
         plt.subplot(2, 2, 1)
         plt.plot(results['linear']['times'], label='Linear', color='blue')
         plt.plot(results['trie']['times'], label='Trie', color='red')
+        plt.plot(results['interval']['times'], label='Interval', color='purple')
         plt.title('Search Time Comparison')
         plt.xlabel('Test Case')
         plt.ylabel('Time (seconds)')
@@ -177,6 +250,7 @@ class PrefixSearchComparator:
         plt.subplot(2, 2, 2)
         plt.plot(results['linear']['comparisons'], label='Linear', color='blue')
         plt.plot(results['trie']['comparisons'], label='Trie', color='red')
+        plt.plot(results['interval']['comparisons'], label='Interval', color='purple')
         plt.title('Number of Comparisons')
         plt.xlabel('Test Case')
         plt.ylabel('Comparisons')
@@ -185,16 +259,21 @@ class PrefixSearchComparator:
 
         plt.subplot(2, 2, 3)
         ratios = [l / t if t > 0 else 1 for l, t in zip(results['linear']['times'], results['trie']['times'])]
-        plt.plot(ratios, color='green')
+        interval_ratios = [l / t if t > 0 else 1
+                           for l, t in zip(results['linear']['times'], results['interval']['times'])]
+        plt.plot(ratios, label='Linear/Trie', color='green')
+        plt.plot(interval_ratios, label='Linear/Interval', color='purple')
         plt.axhline(y=1, color='r', linestyle='--', alpha=0.5)
-        plt.title('Performance Ratio (Linear/Trie)')
+        plt.title('Performance Ratio')
         plt.xlabel('Test Case')
         plt.ylabel('Ratio')
+        plt.yscale('log')
+        plt.legend()
         plt.grid(True, alpha=0.3)
 
         plt.subplot(2, 2, 4)
-        plt.boxplot([results['linear']['times'], results['trie']['times']],
-                    labels=['Linear', 'Trie'])
+        plt.boxplot([results['linear']['times'], results['trie']['times'], results['interval']['times']],
+                    tick_labels=['Linear', 'Trie', 'Interval'])
         plt.title('Distribution of Search Times')
         plt.ylabel('Time (seconds)')
         plt.grid(True, alpha=0.3)
@@ -223,13 +302,18 @@ def run_comparison_test():
         trie_avg = sum(results['trie']['times']) / len(results['trie']['times'])
         linear_comps = sum(results['linear']['comparisons']) / len(results['linear']['comparisons'])
         trie_comps = sum(results['trie']['comparisons']) / len(results['trie']['comparisons'])
+        interval_avg = sum(results['interval']['times']) / len(results['interval']['times'])
+        interval_comps = sum(results['interval']['comparisons']) / len(results['interval']['comparisons'])
 
         print(f"\nResults for {size} prefixes:")
         print(f"Average Linear Search Time: {linear_avg:.6f} seconds")
         print(f"Average Trie Search Time: {trie_avg:.6f} seconds")
+        print(f"Average Interval Search Time: {interval_avg:.6f} seconds")
         print(f"Average Linear Comparisons: {linear_comps:.2f}")
         print(f"Average Trie Comparisons: {trie_comps:.2f}")
+        print(f"Average Interval Comparisons: {interval_comps:.2f}")
         print(f"Speed Improvement: {linear_avg / trie_avg:.2f}x")
+        print(f"Interval Speed Improvement: {linear_avg / interval_avg:.2f}x")
 
     return all_results
 
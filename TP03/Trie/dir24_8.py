@@ -0,0 +1,213 @@
+import ipaddress
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from TP03.performance_analyzer.analyzer import PerformanceAnalyzer
+from TP03.performance_analyzer.decorators import measure_performance
+from .trie import IPKey, ip_to_int
+
+EXTENDED = np.uint32(1 << 31)
+GROUP_SIZE = 256
+
+
+def iter_trie_prefixes(trie) -> Iterable[str]:
+    """Yield every IPv4 prefix stored in an IPTrie, PatriciaIPTrie or Grupo4 trie."""
+    roots = getattr(trie, 'roots', None)
+    stack = [roots[32]] if roots is not None else [trie.root]
+    while stack:
+        node = stack.pop()
+        if node.prefix is not None and ':' not in node.prefix:
+            yield node.prefix
+        children = node.children.values() if isinstance(node.children, dict) else node.children
+        stack.extend(child for child in children if child is not None)
+
+
+class Dir24_8Table:
+    """Compiled DIR-24-8 longest-prefix-match table for IPv4.
+
+    ``tbl24`` has one entry per /24. An entry holds ``prefix id + 1`` (0 is
+    no match), or, when its top bit is set, the index of a 256-entry group
+    in ``tbl8`` that resolves the last octet for prefixes longer than /24.
+    Every lookup is therefore one or two array reads. The parallel
+    ``*_lengths`` arrays keep the mask length behind each entry so prefixes
+    can be added and withdrawn in place without rebuilding.
+
+    The /24 level is a fixed 80 MiB (uint32 entries plus uint8 lengths);
+    each /25-/32 block that is used adds a 1.25 KiB group.
+    """
+
+    def __init__(self):
+        self.analyzer = PerformanceAnalyzer()
+        self.tbl24 = np.zeros(1 << 24, dtype=np.uint32)
+        self.tbl24_lengths = np.zeros(1 << 24, dtype=np.uint8)
+        self.tbl8 = np.zeros(GROUP_SIZE * 64, dtype=np.uint32)
+        self.tbl8_lengths = np.zeros(GROUP_SIZE * 64, dtype=np.uint8)
+        self.groups_used = 0
+        self._free_groups: List[int] = []
+        self.prefixes: List[Optional[str]] = []
+        self._ids: Dict[Tuple[int, int], int] = {}
+        self._free_ids: List[int] = []
+
+    @classmethod
+    def from_prefixes(cls, prefixes: Iterable[str]) -> 'Dir24_8Table':
+        table = cls()
+        for prefix in prefixes:
+            table.insert(prefix)
+        return table
+
+    @classmethod
+    def from_trie(cls, trie) -> 'Dir24_8Table':
+        return cls.from_prefixes(iter_trie_prefixes(trie))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def _parse(prefix: str) -> Tuple[int, int]:
+        network = ipaddress.IPv4Network(prefix, strict=False)
+        return int(network.network_address), network.prefixlen
+
+    def _allocate_group(self, entry: int, length: int) -> int:
+        if self._free_groups:
+            group = self._free_groups.pop()
+        else:
+            group = self.groups_used
+            self.groups_used += 1
+            if self.groups_used * GROUP_SIZE > len(self.tbl8):
+                self.tbl8 = np.concatenate([self.tbl8, np.zeros_like(self.tbl8)])
+                self.tbl8_lengths = np.concatenate([self.tbl8_lengths, np.zeros_like(self.tbl8_lengths)])
+
+        start = group * GROUP_SIZE
+        self.tbl8[start:start + GROUP_SIZE] = entry
+        self.tbl8_lengths[start:start + GROUP_SIZE] = length
+        return group
+
+    def _fill(self, network: int, length: int, entry: int, entry_length: int, replace) -> None:
+        """Write ``entry`` over the addresses of ``network/length`` where ``replace`` holds.
+
+        ``replace(entries, lengths)`` returns the mask of slots to overwrite.
+        """
+        if length <= 24:
+            start = network >> 8
+            block = slice(start, start + (1 << (24 - length)))
+            entries = self.tbl24[block]
+            lengths = self.tbl24_lengths[block]
+            extended = (entries & EXTENDED) != 0
+
+            direct = ~extended & replace(entries, lengths)
+            entries[direct] = entry
+            lengths[direct] = entry_length
+
+            groups = (entries[extended] & ~EXTENDED).astype(np.int64)
+            if len(groups):
+                slots = (groups[:, None] * GROUP_SIZE + np.arange(GROUP_SIZE)).ravel()
+                slots = slots[replace(self.tbl8[slots], self.tbl8_lengths[slots])]
+                self.tbl8[slots] = entry
+                self.tbl8_lengths[slots] = entry_length
+            return
+
+        index = network >> 8
+        head = int(self.tbl24[index])
+        if head & EXTENDED:
+            group = head & ~int(EXTENDED)
+        else:
+            group = self._allocate_group(head, self.tbl24_lengths[index])
+            self.tbl24[index] = EXTENDED | group
+
+        start = group * GROUP_SIZE + (network & 0xFF)
+        block = slice(start, start + (1 << (32 - length)))
+        entries = self.tbl8[block]
+        lengths = self.tbl8_lengths[block]
+        mask = replace(entries, lengths)
+        entries[mask] = entry
+        lengths[mask] = entry_length
+
+    def _collapse(self, index: int) -> None:
+        """Fold a tbl8 group back into tbl24 once no prefix longer than /24 is left in it."""
+        head = int(self.tbl24[index])
+        if not head & EXTENDED:
+            return
+        group = head & ~int(EXTENDED)
+        start = group * GROUP_SIZE
+        if self.tbl8_lengths[start:start + GROUP_SIZE].max() > 24:
+            return
+        self.tbl24[index] = self.tbl8[start]
+        self.tbl24_lengths[index] = self.tbl8_lengths[start]
+        self._free_groups.append(group)
+
+    @measure_performance("insert")
+    def insert(self, prefix: str) -> None:
+        network, length = self._parse(prefix)
+        prefix_id = self._ids.get((network, length))
+        if prefix_id is not None:
+            self.prefixes[prefix_id] = prefix
+            return
+
+        if self._free_ids:
+            prefix_id = self._free_ids.pop()
+            self.prefixes[prefix_id] = prefix
+        else:
+            prefix_id = len(self.prefixes)
+            self.prefixes.append(prefix)
+        self._ids[(network, length)] = prefix_id
+
+        self._fill(network, length, prefix_id + 1, length, lambda entries, lengths: lengths <= length)
+
+    @measure_performance("delete")
+    def delete(self, prefix: str) -> bool:
+        network, length = self._parse(prefix)
+        prefix_id = self._ids.pop((network, length), None)
+        if prefix_id is None:
+            return False
+
+        # Addresses that resolved to the withdrawn prefix now fall back to its
+        # longest covering prefix; more specific entries inside it are untouched.
+        fallback, fallback_length = 0, 0
+        for shorter in range(length - 1, -1, -1):
+            self.analyzer.record_comparison()
+            covering = self._ids.get((network >> (32 - shorter) << (32 - shorter) if shorter else 0, shorter))
+            if covering is not None:
+                fallback, fallback_length = covering + 1, shorter
+                break
+
+        self._fill(network, length, fallback, fallback_length,
+                   lambda entries, lengths: entries == prefix_id + 1)
+        if length > 24:
+            self._collapse(network >> 8)
+
+        self.prefixes[prefix_id] = None
+        self._free_ids.append(prefix_id)
+        return True
+
+    def rebuild(self, prefixes: Iterable[str]) -> None:
+        """Replace the table contents with ``prefixes``."""
+        fresh = type(self).from_prefixes(prefixes)
+        fresh.analyzer = self.analyzer
+        self.__dict__.update(fresh.__dict__)
+
+    @measure_performance("lookup")
+    def lookup(self, ip: IPKey) -> Optional[str]:
+        value, bits = ip_to_int(ip)
+        if bits != 32:
+            raise ValueError(f"{ip!r} is not an IPv4 address")
+
+        entry = int(self.tbl24[value >> 8])
+        if entry & EXTENDED:
+            entry = int(self.tbl8[(entry & ~int(EXTENDED)) * GROUP_SIZE + (value & 0xFF)])
+            self.analyzer.record_comparisons(2)
+        else:
+            self.analyzer.record_comparison()
+        return self.prefixes[entry - 1] if entry else None
+
+    @measure_performance("lookup_many")
+    def lookup_many(self, addresses: np.ndarray) -> np.ndarray:
+        """Resolve a uint32 array of addresses to prefix ids (-1 where nothing matches)."""
+        addresses = np.asarray(addresses, dtype=np.uint32)
+        entries = self.tbl24[addresses >> 8]
+        extended = (entries & EXTENDED) != 0
+        if extended.any():
+            groups = (entries[extended] & ~EXTENDED).astype(np.int64)
+            entries[extended] = self.tbl8[groups * GROUP_SIZE + (addresses[extended] & 0xFF)]
+        self.analyzer.record_comparisons(len(addresses) + int(extended.sum()))
+        return entries.astype(np.int64) - 1
@@ -0,0 +1,240 @@
+import ipaddress
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from TP03.performance_analyzer.analyzer import PerformanceAnalyzer
+from TP03.performance_analyzer.decorators import measure_performance
+from .interval_index import IntervalIndex
+from .trie import IPKey, ip_to_int
+
+NIL = -1
+STRIDE = 4
+FANOUT = 1 << STRIDE
+SLOT_MASK = FANOUT - 1
+
+
+class DualStackTrie:
+    """IPv4 + IPv6 longest-prefix-match engine over one pool of multibit nodes.
+
+    Every node is a block of ``FANOUT`` consecutive slots in the pool arrays
+    and consumes ``STRIDE`` address bits. For slot ``s``, ``children[s]`` is
+    the offset of the next block (``NIL`` at the bottom) and ``prefix_ids[s]``
+    the most specific prefix ending in this block that covers the slot, with
+    its mask length in ``prefix_lengths[s]``. A prefix whose length is not a
+    multiple of the stride is expanded over the slots it covers, so a lookup
+    is at most 8 steps for IPv4 and 32 for IPv6, each a couple of array reads.
+
+    Both families share the arrays and only differ in their root block and
+    key width. Freed blocks and prefix ids are recycled through free lists.
+    """
+
+    def __init__(self):
+        self.analyzer = PerformanceAnalyzer()
+        self.children = array('i')
+        self.prefix_ids = array('i')
+        self.prefix_lengths = array('B')
+        self._free: List[int] = []
+        self.roots: Dict[int, int] = {32: self._new_block(), 128: self._new_block()}
+
+        self.prefixes: List[Optional[str]] = []
+        self.payloads: List[Any] = []
+        self._keys: List[Optional[Tuple[int, int, int]]] = []
+        self._ids: Dict[Tuple[int, int, int], int] = {}
+        self._free_ids: List[int] = []
+        self._interval_indexes: Dict[int, IntervalIndex] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def node_count(self) -> int:
+        return len(self.children) // FANOUT - len(self._free)
+
+    def _new_block(self) -> int:
+        if self._free:
+            block = self._free.pop()
+            end = block + FANOUT
+            self.children[block:end] = array('i', [NIL]) * FANOUT
+            self.prefix_ids[block:end] = array('i', [NIL]) * FANOUT
+            self.prefix_lengths[block:end] = array('B', bytes(FANOUT))
+            return block
+
+        block = len(self.children)
+        self.children.extend([NIL] * FANOUT)
+        self.prefix_ids.extend([NIL] * FANOUT)
+        self.prefix_lengths.extend(bytes(FANOUT))
+        return block
+
+    @staticmethod
+    def _get_network_and_mask(prefix: str) -> Tuple[int, int, int]:
+        network = ipaddress.ip_network(prefix, strict=False)
+        return int(network.network_address), network.prefixlen, network.max_prefixlen
+
+    @staticmethod
+    def _slots(value: int, length: int, bits: int) -> Tuple[int, range]:
+        """Depth of the block holding ``value/length`` and the slot offsets it expands to."""
+        depth = max(length - 1, 0) // STRIDE
+        first = (value >> (bits - (depth + 1) * STRIDE)) & SLOT_MASK
+        span = 1 << ((depth + 1) * STRIDE - length)
+        first &= ~(span - 1)
+        return depth, range(first, first + span)
+
+    def _path(self, value: int, depth: int, bits: int, create: bool) -> List[int]:
+        """Blocks from the family root down to ``depth`` along ``value``."""
+        children = self.children
+        path = [self.roots[bits]]
+        for level in range(depth):
+            slot = path[-1] + ((value >> (bits - (level + 1) * STRIDE)) & SLOT_MASK)
+            block = children[slot]
+            if block == NIL:
+                if not create:
+                    break
+                block = children[slot] = self._new_block()
+            path.append(block)
+        self.analyzer.record_comparisons(len(path))
+        return path
+
+    @measure_performance("insert")
+    def insert(self, prefix: str, payload: Any = None) -> None:
+        value, length, bits = self._get_network_and_mask(prefix)
+        key = (value, length, bits)
+        prefix_id = self._ids.get(key)
+        if prefix_id is not None:
+            self.prefixes[prefix_id] = prefix
+            self.payloads[prefix_id] = payload
+            return
+
+        if self._free_ids:
+            prefix_id = self._free_ids.pop()
+            self.prefixes[prefix_id] = prefix
+            self.payloads[prefix_id] = payload
+            self._keys[prefix_id] = key
+        else:
+            prefix_id = len(self.prefixes)
+            self.prefixes.append(prefix)
+            self.payloads.append(payload)
+            self._keys.append(key)
+        self._ids[key] = prefix_id
+        self._interval_indexes = {}
+
+        depth, slots = self._slots(value, length, bits)
+        block = self._path(value, depth, bits, create=True)[-1]
+        prefix_ids, prefix_lengths = self.prefix_ids, self.prefix_lengths
+        for offset in slots:
+            slot = block + offset
+            if prefix_ids[slot] == NIL or prefix_lengths[slot] <= length:
+                prefix_ids[slot] = prefix_id
+                prefix_lengths[slot] = length
+
+    @measure_performance("contains")
+    def contains_prefix(self, prefix: str) -> bool:
+        return self._get_network_and_mask(prefix) in self._ids
+
+    def get(self, prefix: str) -> Any:
+        prefix_id = self._ids.get(self._get_network_and_mask(prefix))
+        if prefix_id is None:
+            raise KeyError(prefix)
+        return self.payloads[prefix_id]
+
+    @measure_performance("delete")
+    def delete(self, prefix: str) -> bool:
+        value, length, bits = self._get_network_and_mask(prefix)
+        prefix_id = self._ids.pop((value, length, bits), None)
+        if prefix_id is None:
+            return False
+
+        self.prefixes[prefix_id] = None
+        self.payloads[prefix_id] = None
+        self._keys[prefix_id] = None
+        self._free_ids.append(prefix_id)
+        self._interval_indexes = {}
+
+        # Slots that resolved to the withdrawn prefix fall back to its longest
+        # covering prefix stored in the same block; shorter ones live higher up
+        # and are picked up there during the walk.
+        depth, slots = self._slots(value, length, bits)
+        fallback, fallback_length = NIL, 0
+        for shorter in range(length - 1, depth * STRIDE if depth else -1, -1):
+            self.analyzer.record_comparison()
+            covering = self._ids.get((value >> (bits - shorter) << (bits - shorter), shorter, bits))
+            if covering is not None:
+                fallback, fallback_length = covering, shorter
+                break
+
+        path = self._path(value, depth, bits, create=False)
+        prefix_ids, prefix_lengths, children = self.prefix_ids, self.prefix_lengths, self.children
+        block = path[-1]
+        for offset in slots:
+            slot = block + offset
+            if prefix_ids[slot] == prefix_id:
+                prefix_ids[slot] = fallback
+                prefix_lengths[slot] = fallback_length
+
+        # The roots stay; any other block is only kept while one of its slots
+        # still holds a prefix or a child.
+        for level in range(len(path) - 1, 0, -1):
+            block = path[level]
+            if any(prefix_ids[slot] != NIL or children[slot] != NIL for slot in range(block, block + FANOUT)):
+                break
+            parent = path[level - 1]
+            children[parent + ((value >> (bits - level * STRIDE)) & SLOT_MASK)] = NIL
+            self._free.append(block)
+        return True
+
+    def _match(self, value: int, bits: int) -> int:
+        children, prefix_ids = self.children, self.prefix_ids
+        block = self.roots[bits]
+        shift = bits - STRIDE
+        matched = NIL
+        visited = 0
+
+        while block != NIL:
+            visited += 1
+            slot = block + ((value >> shift) & SLOT_MASK)
+            prefix_id = prefix_ids[slot]
+            if prefix_id != NIL:
+                matched = prefix_id
+            block = children[slot]
+            shift -= STRIDE
+
+        self.analyzer.record_comparisons(visited)
+        return matched
+
+    @measure_performance("match")
+    def match(self, ip: IPKey) -> Optional[str]:
+        prefix_id = self._match(*ip_to_int(ip))
+        return self.prefixes[prefix_id] if prefix_id != NIL else None
+
+    @measure_performance("match")
+    def match_int(self, value: int, bits: int = 32) -> Optional[str]:
+        prefix_id = self._match(value, bits)
+        return self.prefixes[prefix_id] if prefix_id != NIL else None
+
+    @measure_performance("match")
+    def match_id(self, ip: IPKey) -> int:
+        return self._match(*ip_to_int(ip))
+
+    @measure_performance("match")
+    def match_payload(self, ip: IPKey, default: Any = None) -> Any:
+        prefix_id = self._match(*ip_to_int(ip))
+        return self.payloads[prefix_id] if prefix_id != NIL else default
+
+    def interval_index(self, bits: int = 32) -> IntervalIndex:
+        # Writers swap in a new cache after changing _keys, so an index built
+        # from keys that changed meanwhile is stored where nobody looks.
+        cache = self._interval_indexes
+        index = cache.get(bits)
+        if index is None:
+            entries = [(key[0], key[1], prefix_id) for prefix_id, key in enumerate(self._keys)
+                       if key is not None and key[2] == bits]
+            index = cache[bits] = IntervalIndex.from_prefixes(entries, bits)
+        return index
+
+    @measure_performance("match_many")
+    def match_many(self, addresses: np.ndarray) -> np.ndarray:
+        """Prefix ids for a uint32 (IPv4) or ``IPV6_DTYPE`` (IPv6) array, -1 for no match."""
+        addresses = np.asarray(addresses)
+        index = self.interval_index(128 if addresses.dtype.names else 32)
+        self.analyzer.record_comparisons(len(addresses) * len(index).bit_length())
+        return index.lookup_many(addresses)
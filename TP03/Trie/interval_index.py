@@ -0,0 +1,98 @@
+from bisect import bisect_right
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+IPV6_DTYPE = np.dtype([('hi', np.uint64), ('lo', np.uint64)])
+_LOW_64 = (1 << 64) - 1
+
+
+def to_ipv6_array(values: Iterable[int]) -> np.ndarray:
+    """Pack 128-bit integers into the structured ``(hi, lo)`` array used by ``match_many``."""
+    values = list(values)
+    packed = np.empty(len(values), dtype=IPV6_DTYPE)
+    packed['hi'] = [value >> 64 for value in values]
+    packed['lo'] = [value & _LOW_64 for value in values]
+    return packed
+
+
+class IntervalIndex:
+    """Longest-prefix match as a search over sorted, non-overlapping address ranges.
+
+    The prefix set is flattened once into range start points, each tagged
+    with the id of the most specific prefix covering that range (-1 for
+    gaps). A lookup is then a single binary search: ``bisect`` for one
+    address, ``np.searchsorted`` for an array of them.
+    """
+
+    def __init__(self, starts: List[int], ids: List[int], bits: int):
+        self.starts = starts
+        self.ids = ids
+        self.bits = bits
+        self._ids_array = np.array(ids, dtype=np.int64)
+        if bits == 32:
+            self._starts_array = np.array(starts, dtype=np.uint32)
+        else:
+            self._starts_array = to_ipv6_array(starts)
+
+    @classmethod
+    def from_prefixes(cls, prefixes: Iterable[Tuple[int, int, int]], bits: int) -> 'IntervalIndex':
+        """Build from ``(network, mask_length, prefix_id)`` tuples of one address family."""
+        starts = [0]
+        ids = [-1]
+
+        def emit(position: int, prefix_id: int) -> None:
+            if position >= 1 << bits:
+                return
+            if starts[-1] == position:
+                starts.pop()
+                ids.pop()
+            if not ids or ids[-1] != prefix_id:
+                starts.append(position)
+                ids.append(prefix_id)
+
+        # Prefixes either nest or are disjoint, so a stack of the ones still
+        # open gives the most specific prefix at every boundary.
+        open_prefixes: List[Tuple[int, int]] = []
+        for network, length, prefix_id in sorted(prefixes, key=lambda item: (item[0], item[1])):
+            while open_prefixes and open_prefixes[-1][0] < network:
+                end = open_prefixes.pop()[0]
+                emit(end + 1, open_prefixes[-1][1] if open_prefixes else -1)
+            emit(network, prefix_id)
+            open_prefixes.append((network | ((1 << (bits - length)) - 1), prefix_id))
+
+        while open_prefixes:
+            end = open_prefixes.pop()[0]
+            emit(end + 1, open_prefixes[-1][1] if open_prefixes else -1)
+
+        return cls(starts, ids, bits)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def lookup(self, value: int) -> int:
+        return self.ids[bisect_right(self.starts, value) - 1]
+
+    def lookup_many(self, addresses: np.ndarray) -> np.ndarray:
+        """Return the prefix id for every address (-1 where nothing matches).
+
+        IPv4 addresses are a uint32 array, IPv6 addresses a ``IPV6_DTYPE`` array.
+        """
+        if self.bits == 32:
+            positions = np.searchsorted(self._starts_array, np.asarray(addresses, dtype=np.uint32), 'right')
+            return self._ids_array[positions - 1]
+
+        # Search the high word first; only addresses sharing it with one or
+        # more range starts need the low word compared, usually a step or two.
+        starts_hi, starts_lo = self._starts_array['hi'], self._starts_array['lo']
+        addresses_hi, addresses_lo = addresses['hi'], addresses['lo']
+        positions = np.searchsorted(starts_hi, addresses_hi, 'left')
+        group_end = np.searchsorted(starts_hi, addresses_hi, 'right')
+
+        active = np.nonzero(positions < group_end)[0]
+        while len(active):
+            active = active[starts_lo[positions[active]] <= addresses_lo[active]]
+            positions[active] += 1
+            active = active[positions[active] < group_end[active]]
+
+        return self._ids_array[positions - 1]
@@ -0,0 +1,181 @@
+import mmap
+import struct
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from TP03.performance_analyzer.analyzer import PerformanceAnalyzer
+from TP03.performance_analyzer.decorators import measure_performance
+from .patricia_trie import PatriciaIPTrie
+from .trie import IPKey, IPTrie, ip_to_int
+
+MAGIC = b'IPTRIE\x00\x01'
+BYTE_ORDER_MARK = 0x01020304
+# magic, byte order mark, IPv4 nodes, IPv6 nodes, prefix count, string bytes
+HEADER = struct.Struct('=8sIQQQQ')
+FAMILIES = (32, 128)
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+def _flatten(root) -> Tuple[List[int], List[int], List[int], List[int], List[int]]:
+    """Number Patricia nodes in preorder and return their fields as parallel lists."""
+    values, lengths, left, right, prefix_ids = [], [], [], [], []
+    stack = [(root, None, 0)]
+    while stack:
+        node, parent, bit = stack.pop()
+        index = len(values)
+        if parent is not None:
+            (right if bit else left)[parent] = index
+        values.append(node.value)
+        lengths.append(node.length)
+        left.append(-1)
+        right.append(-1)
+        prefix_ids.append(node.prefix_id if node.is_end else -1)
+        for child_bit in (1, 0):
+            child = node.children[child_bit]
+            if child is not None:
+                stack.append((child, index, child_bit))
+    return values, lengths, left, right, prefix_ids
+
+
+def save_trie(trie: IPTrie, path: str) -> None:
+    """Write ``trie`` as flat node arrays that ``MappedIPTrie`` queries in place.
+
+    Tries other than PatriciaIPTrie are compressed first. Prefix ids are
+    kept; payloads are not stored.
+    """
+    if not isinstance(trie, PatriciaIPTrie):
+        compressed = PatriciaIPTrie()
+        for prefix in trie.prefixes:
+            if prefix is None:
+                # Keep the ids of the remaining prefixes unchanged.
+                compressed.prefixes.append(None)
+                compressed._keys.append(None)
+            else:
+                compressed.insert(prefix)
+        trie = compressed
+
+    strings = [(prefix or '').encode() for prefix in trie.prefixes]
+    offsets = array('Q', [0])
+    for encoded in strings:
+        offsets.append(offsets[-1] + len(encoded))
+    blob = b''.join(strings)
+
+    sections = []
+    node_counts = []
+    for bits in FAMILIES:
+        values, lengths, left, right, prefix_ids = _flatten(trie.roots[bits])
+        node_counts.append(len(values))
+        if bits == 128:
+            sections.append(array('Q', [value >> 64 for value in values]))
+        sections.append(array('Q', [value & 0xFFFFFFFFFFFFFFFF for value in values]))
+        sections.append(array('i', lengths))
+        sections.append(array('i', left))
+        sections.append(array('i', right))
+        sections.append(array('i', prefix_ids))
+    sections.append(offsets)
+
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, BYTE_ORDER_MARK, node_counts[0], node_counts[1],
+                               len(strings), len(blob)))
+        file.write(bytes(_pad(HEADER.size)))
+        for section in sections:
+            data = section.tobytes()
+            file.write(data)
+            file.write(bytes(_pad(len(data))))
+        file.write(blob)
+
+
+class MappedIPTrie:
+    """Read-only IP trie served straight from a file written by ``save_trie``.
+
+    The file is mapped with ``mmap`` and the node arrays are read through
+    ``memoryview`` casts, so opening costs no parsing or object creation and
+    processes that map the same file share one copy in the page cache.
+    """
+
+    def __init__(self, path: str):
+        self.analyzer = PerformanceAnalyzer()
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+        magic, mark, v4_nodes, v6_nodes, prefix_count, blob_size = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a serialized IP trie")
+        if mark != BYTE_ORDER_MARK:
+            raise ValueError(f"{path} was written on a machine with a different byte order")
+
+        self._offset = HEADER.size + _pad(HEADER.size)
+        self._families: Dict[int, Tuple] = {}
+        for bits, count in zip(FAMILIES, (v4_nodes, v6_nodes)):
+            high = self._section('Q', count) if bits == 128 else None
+            self._families[bits] = (high, self._section('Q', count), self._section('i', count),
+                                    self._section('i', count), self._section('i', count),
+                                    self._section('i', count))
+        self._string_offsets = self._section('Q', prefix_count + 1)
+        self._strings = self._view[self._offset:self._offset + blob_size]
+        self.prefix_count = prefix_count
+
+    def _section(self, typecode: str, count: int) -> memoryview:
+        size = count * (8 if typecode == 'Q' else 4)
+        section = self._view[self._offset:self._offset + size].cast(typecode)
+        self._offset += size + _pad(size)
+        return section
+
+    def prefix(self, prefix_id: int) -> Optional[str]:
+        start, end = self._string_offsets[prefix_id], self._string_offsets[prefix_id + 1]
+        return bytes(self._strings[start:end]).decode() if end > start else None
+
+    def _match_id(self, value: int, bits: int) -> int:
+        high, low, lengths, left, right, prefix_ids = self._families[bits]
+        node = 0
+        matched = -1
+        visited = 0
+
+        while node >= 0:
+            visited += 1
+            length = lengths[node]
+            prefix_id = prefix_ids[node]
+            if prefix_id >= 0:
+                network = low[node] if high is None else high[node] << 64 | low[node]
+                if (value ^ network) >> (bits - length):
+                    break
+                matched = prefix_id
+            if length == bits:
+                break
+            node = (right if (value >> (bits - 1 - length)) & 1 else left)[node]
+
+        self.analyzer.record_comparisons(visited)
+        return matched
+
+    @measure_performance("match")
+    def match_ip(self, ip: IPKey) -> Optional[str]:
+        value, bits = ip_to_int(ip)
+        prefix_id = self._match_id(value, bits)
+        return self.prefix(prefix_id) if prefix_id >= 0 else None
+
+    @measure_performance("match")
+    def match_int(self, value: int, bits: int = 32) -> Optional[str]:
+        prefix_id = self._match_id(value, bits)
+        return self.prefix(prefix_id) if prefix_id >= 0 else None
+
+    def close(self) -> None:
+        for family in self._families.values():
+            for section in family:
+                if section is not None:
+                    section.release()
+        self._families = {}
+        self._string_offsets.release()
+        self._strings.release()
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
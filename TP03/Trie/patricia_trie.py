@@ -0,0 +1,168 @@
+from typing import Any, List, Optional
+
+from .trie import IPTrie, TrieNode
+
+
+class PatriciaNode(TrieNode):
+    __slots__ = ('value', 'length')
+
+    def __init__(self, value: int, length: int):
+        super().__init__()
+        self.value = value
+        self.length = length
+
+
+def _common_length(a: int, b: int, bits: int, limit: int) -> int:
+    """Number of leading bits (at most ``limit``) shared by two ``bits``-wide keys."""
+    diff = (a ^ b) >> (bits - limit)
+    return limit - diff.bit_length()
+
+
+class PatriciaIPTrie(IPTrie):
+    """Path-compressed drop-in replacement for IPTrie.
+
+    Every node stores the full network value and its length, so chains of
+    single-child nodes collapse into one edge: the trie holds at most two
+    nodes per prefix regardless of mask length. IPv4 and IPv6 prefixes live
+    under separate roots. Comparison counts are nodes visited, not bits.
+    """
+
+    @staticmethod
+    def _new_root() -> PatriciaNode:
+        return PatriciaNode(0, 0)
+
+    def _insert(self, prefix: str, payload: Any) -> None:
+        value, length, bits = self._get_network_and_mask(prefix)
+
+        node = self.roots[bits] = self._writable(self.roots[bits])
+        visited = 1
+        while node.length != length:
+            bit = (value >> (bits - 1 - node.length)) & 1
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = child = self._created(PatriciaNode(value, length))
+                node = child
+                break
+
+            visited += 1
+            common = _common_length(child.value, value, bits, min(child.length, length))
+            if common == child.length:
+                node.children[bit] = child = self._writable(child)
+                node = child
+                continue
+
+            split = self._created(PatriciaNode(value >> (bits - common) << (bits - common), common))
+            split.children[(child.value >> (bits - 1 - common)) & 1] = child
+            node.children[bit] = split
+            if common == length:
+                node = split
+            else:
+                node = split.children[(value >> (bits - 1 - common)) & 1] = \
+                    self._created(PatriciaNode(value, length))
+            break
+        self.analyzer.record_comparisons(visited)
+
+        node.prefix = prefix
+        node.mask_length = length
+        node.payload = payload
+        self._register(node, value, length, bits)
+        node.is_end = True
+
+    def _delete(self, prefix: str) -> bool:
+        """Remove a prefix, splicing out nodes that no longer branch."""
+        value, length, bits = self._get_network_and_mask(prefix)
+        node = self._find(value, length, bits)
+        if node is None or not node.is_end:
+            return False
+
+        node = self.roots[bits] = self._writable(self.roots[bits])
+        path = [node]
+        while node.length < length:
+            bit = (value >> (bits - 1 - node.length)) & 1
+            node.children[bit] = child = self._writable(node.children[bit])
+            node = child
+            path.append(node)
+
+        node.is_end = False
+        self._unregister(node)
+        node.clear()
+
+        # The root stays; any other node is only kept while it carries a
+        # prefix or still separates two subtrees.
+        for depth in range(len(path) - 1, 0, -1):
+            node = path[depth]
+            children = [child for child in node.children if child is not None]
+            if node.is_end or len(children) == 2:
+                break
+            parent = path[depth - 1]
+            parent.children[(value >> (bits - 1 - parent.length)) & 1] = children[0] if children else None
+            if children:
+                break
+        return True
+
+    # Lookups walk the compressed trie itself, so IPTrie's per-length tables
+    # are not kept.
+    def _index(self, node, network: int, mask_length: int, bits: int) -> None:
+        pass
+
+    def _unindex(self, network: int, mask_length: int, bits: int) -> None:
+        pass
+
+    def _find(self, value: int, length: int, bits: int) -> Optional[PatriciaNode]:
+        node = self.roots[bits]
+        while node is not None and node.length < length:
+            self.analyzer.record_comparison()
+            node = node.children[(value >> (bits - 1 - node.length)) & 1]
+        if node is None or node.length != length or node.value != value:
+            return None
+        return node
+
+    def _match(self, value: int, bits: int) -> Optional[PatriciaNode]:
+        node = self.roots[bits]
+        matched = None
+        visited = 0
+
+        # Branch-only nodes are descended without checking their skipped bits:
+        # a mismatch there also rules out every prefix below, and it is caught
+        # at the next prefix node, where the walk stops.
+        while node is not None:
+            visited += 1
+            length = node.length
+            if node.is_end:
+                if (value ^ node.value) >> (bits - length):
+                    break
+                matched = node
+            if length == bits:
+                break
+            node = node.children[(value >> (bits - 1 - length)) & 1]
+
+        self.analyzer.record_comparisons(visited)
+        return matched
+
+    def _covering(self, value: int, bits: int) -> List[PatriciaNode]:
+        node = self.roots[bits]
+        covering = []
+        visited = 0
+
+        while node is not None:
+            visited += 1
+            length = node.length
+            if node.is_end:
+                if (value ^ node.value) >> (bits - length):
+                    break
+                covering.append(node)
+            if length == bits:
+                break
+            node = node.children[(value >> (bits - 1 - length)) & 1]
+
+        self.analyzer.record_comparisons(visited)
+        return covering
+
+    def _subtree(self, network: int, mask_length: int, bits: int) -> Optional[PatriciaNode]:
+        node = self.roots[bits]
+        while node is not None and node.length < mask_length:
+            self.analyzer.record_comparison()
+            node = node.children[(network >> (bits - 1 - node.length)) & 1]
+        if node is None or (node.value ^ network) >> (bits - mask_length):
+            return None
+        return node
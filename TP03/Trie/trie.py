@@ -1,89 +1,496 @@
+import copy
 import ipaddress
-from typing import Optional, Dict, Tuple
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, NamedTuple, Optional, List, Tuple, Union
+
+import numpy as np
 
 from TP03.performance_analyzer.analyzer import PerformanceAnalyzer, PerformanceVisualizer
 from TP03.performance_analyzer.decorators import measure_performance
+from .interval_index import IntervalIndex
+
+IPKey = Union[str, int, bytes, ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+def ip_to_int(ip: IPKey) -> Tuple[int, int]:
+    """Return ``(value, bit_length)`` for an address given as text, int or packed bytes.
+
+    Plain ints below 2**32 are taken as IPv4; use ``IPTrie.match_int`` with
+    ``bits=128`` for small IPv6 values.
+    """
+    if isinstance(ip, str):
+        try:
+            if ':' in ip:
+                return int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), 'big'), 128
+            return int.from_bytes(socket.inet_pton(socket.AF_INET, ip), 'big'), 32
+        except OSError:
+            raise ValueError(f"{ip!r} does not appear to be an IPv4 or IPv6 address") from None
+
+    if isinstance(ip, (bytes, bytearray, memoryview)):
+        if len(ip) == 4:
+            return int.from_bytes(ip, 'big'), 32
+        if len(ip) == 16:
+            return int.from_bytes(ip, 'big'), 128
+        raise ValueError(f"packed address must be 4 or 16 bytes, got {len(ip)}")
+
+    if isinstance(ip, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+        return int(ip), ip.max_prefixlen
+
+    if isinstance(ip, int):
+        if 0 <= ip < 1 << 32:
+            return ip, 32
+        if 0 <= ip < 1 << 128:
+            return ip, 128
+        raise ValueError(f"{ip} is out of range for an IP address")
+
+    raise TypeError(f"unsupported address type: {type(ip).__name__}")
 
 
 class TrieNode:
+    __slots__ = ('children', 'is_end', 'prefix', 'mask_length', 'prefix_id', 'payload')
+
     def __init__(self):
-        self.children: Dict[int, 'TrieNode'] = {}
+        self.children: List[Optional['TrieNode']] = [None, None]
         self.is_end: bool = False
         self.prefix: Optional[str] = None
         self.mask_length: Optional[int] = None
+        self.prefix_id: Optional[int] = None
+        self.payload: Any = None
+
+    def copy(self) -> 'TrieNode':
+        clone = copy.copy(self)
+        clone.children = list(self.children)
+        return clone
+
+    def clear(self) -> None:
+        self.is_end = False
+        self.prefix = None
+        self.mask_length = None
+        self.prefix_id = None
+        self.payload = None
+
+
+class TrieVersion(NamedTuple):
+    """Everything an IPTrie lookup reads.
+
+    A committed transaction replaces the whole version with one assignment,
+    and every lookup takes the version once, so ``match_ip`` and
+    ``match_many`` never mix the tables of two commits.
+    """
+    # IPv4 and IPv6 prefixes are kept apart so that, say, 0.0.0.0/0 never
+    # matches an IPv6 address.
+    roots: Dict[int, TrieNode]
+    prefixes: List[Optional[str]]
+    keys: List[Optional[Tuple[int, int, int]]]
+    # Ids of deleted prefixes, handed out again before ``prefixes`` grows.
+    free_ids: List[int]
+    # Stored prefixes per family and mask length, keyed by their network
+    # bits, plus each family's tables longest length first. Lookups probe
+    # these instead of walking the trie one bit at a time.
+    networks: Dict[int, Dict[int, Dict[int, TrieNode]]]
+    probe_order: Dict[int, List[Tuple[int, Dict[int, TrieNode]]]]
+    interval_indexes: Dict[int, IntervalIndex]
 
 
 class IPTrie:
 
     def __init__(self):
-        self.root = TrieNode()
+        self._version = TrieVersion(
+            roots={32: self._new_root(), 128: self._new_root()},
+            prefixes=[], keys=[], free_ids=[],
+            networks={32: {}, 128: {}}, probe_order={32: [], 128: []},
+            interval_indexes={},
+        )
         self.analyzer = PerformanceAnalyzer()
+        self._write_lock = threading.Lock()
 
-    def _ip_to_binary(self, ip: str) -> str:
-        ip_obj = ipaddress.ip_address(ip)
-        if isinstance(ip_obj, ipaddress.IPv4Address):
-            return format(int(ip_obj), '032b')
-        else:
-            return format(int(ip_obj), '0128b')
+    @staticmethod
+    def _new_root() -> TrieNode:
+        return TrieNode()
+
+    @property
+    def roots(self) -> Dict[int, TrieNode]:
+        return self._version.roots
+
+    @property
+    def prefixes(self) -> List[Optional[str]]:
+        return self._version.prefixes
+
+    @property
+    def _keys(self) -> List[Optional[Tuple[int, int, int]]]:
+        return self._version.keys
+
+    @property
+    def _free_ids(self) -> List[int]:
+        return self._version.free_ids
+
+    @property
+    def _networks(self) -> Dict[int, Dict[int, Dict[int, TrieNode]]]:
+        return self._version.networks
+
+    @property
+    def _probe_order(self) -> Dict[int, List[Tuple[int, Dict[int, TrieNode]]]]:
+        return self._version.probe_order
+
+    @property
+    def _interval_indexes(self) -> Dict[int, IntervalIndex]:
+        return self._version.interval_indexes
+
+    def _drop_interval_indexes(self) -> None:
+        # A new empty cache rather than clearing the old one, so an index a
+        # reader is still building from the old keys is never stored where
+        # later lookups find it.
+        self._version = self._version._replace(interval_indexes={})
+
+    # Every mutation goes through these two hooks. Outside a transaction they
+    # change nodes in place, under ``_write_lock``, flagging a node as a prefix
+    # only once its id is registered; a reader racing a direct delete may still
+    # get the prefix being removed. A TrieTransaction swaps in copy-on-write
+    # versions, so readers see either the old table or the new one.
+    @staticmethod
+    def _writable(node):
+        return node
 
-    def _get_network_and_mask(self, prefix: str) -> Tuple[str, int]:
+    @staticmethod
+    def _created(node):
+        return node
+
+    def _get_network_and_mask(self, prefix: str) -> Tuple[int, int, int]:
         network = ipaddress.ip_network(prefix, strict=False)
-        return str(network.network_address), network.prefixlen
+        return int(network.network_address), network.prefixlen, network.max_prefixlen
 
     @measure_performance("insert")
-    def insert(self, prefix: str) -> None:
-        network_addr, mask_length = self._get_network_and_mask(prefix)
-        binary_ip = self._ip_to_binary(network_addr)
+    def insert(self, prefix: str, payload: Any = None) -> None:
+        with self._write_lock:
+            self._insert(prefix, payload)
+
+    def _insert(self, prefix: str, payload: Any) -> None:
+        network, mask_length, bits = self._get_network_and_mask(prefix)
+
+        current = self.roots[bits] = self._writable(self.roots[bits])
+        for shift in range(bits - 1, bits - 1 - mask_length, -1):
+            bit = (network >> shift) & 1
+            child = current.children[bit]
+            child = self._created(TrieNode()) if child is None else self._writable(child)
+            current.children[bit] = child
+            current = child
+        self.analyzer.record_comparisons(mask_length)
 
-        current = self.root
-        for i in range(mask_length):
-            self.analyzer.record_comparison()
-            bit = int(binary_ip[i])
-            if bit not in current.children:
-                current.children[bit] = TrieNode()
-            current = current.children[bit]
-
-        current.is_end = True
         current.prefix = prefix
         current.mask_length = mask_length
+        current.payload = payload
+        self._register(current, network, mask_length, bits)
+        current.is_end = True
+
+    @measure_performance("update")
+    def update(self, prefix: str, payload: Any) -> None:
+        """Replace the payload of a stored prefix; raises KeyError if it is absent."""
+        with self._write_lock:
+            if not self.contains_prefix(prefix):
+                raise KeyError(prefix)
+            self._insert(prefix, payload)
+
+    def get(self, prefix: str) -> Any:
+        node = self._find(*self._get_network_and_mask(prefix))
+        if node is None or not node.is_end:
+            raise KeyError(prefix)
+        return node.payload
+
+    @measure_performance("delete")
+    def delete(self, prefix: str) -> bool:
+        """Remove a prefix and prune the nodes left without prefixes below them."""
+        with self._write_lock:
+            return self._delete(prefix)
+
+    def _delete(self, prefix: str) -> bool:
+        network, mask_length, bits = self._get_network_and_mask(prefix)
+        node = self._find(network, mask_length, bits)
+        if node is None or not node.is_end:
+            return False
+
+        current = self.roots[bits] = self._writable(self.roots[bits])
+        path = [current]
+        for shift in range(bits - 1, bits - 1 - mask_length, -1):
+            bit = (network >> shift) & 1
+            child = current.children[bit] = self._writable(current.children[bit])
+            path.append(child)
+            current = child
+
+        current.is_end = False
+        self._unregister(current)
+        current.clear()
+
+        for depth in range(mask_length, 0, -1):
+            node = path[depth]
+            if node.is_end or node.children[0] is not None or node.children[1] is not None:
+                break
+            path[depth - 1].children[(network >> (bits - depth)) & 1] = None
+        return True
+
+    def _register(self, node, network: int, mask_length: int, bits: int) -> None:
+        """Give a newly stored prefix its stable id, used by ``match_many``."""
+        if node.prefix_id is None:
+            if self._free_ids:
+                node.prefix_id = self._free_ids.pop()
+                self.prefixes[node.prefix_id] = node.prefix
+                self._keys[node.prefix_id] = (network, mask_length, bits)
+            else:
+                node.prefix_id = len(self.prefixes)
+                self.prefixes.append(node.prefix)
+                self._keys.append((network, mask_length, bits))
+            self._drop_interval_indexes()
+        else:
+            self.prefixes[node.prefix_id] = node.prefix
+        self._index(node, network, mask_length, bits)
+
+    def _unregister(self, node) -> None:
+        self._unindex(*self._keys[node.prefix_id])
+        self.prefixes[node.prefix_id] = None
+        self._keys[node.prefix_id] = None
+        self._free_ids.append(node.prefix_id)
+        self._drop_interval_indexes()
+
+    def _index(self, node, network: int, mask_length: int, bits: int) -> None:
+        tables = self._networks[bits]
+        table = tables.get(mask_length)
+        if table is None:
+            table = tables[mask_length] = {}
+            self._reorder(bits)
+        table[network >> (bits - mask_length)] = node
+
+    def _unindex(self, network: int, mask_length: int, bits: int) -> None:
+        tables = self._networks[bits]
+        table = tables[mask_length]
+        del table[network >> (bits - mask_length)]
+        if not table:
+            del tables[mask_length]
+            self._reorder(bits)
+
+    def _reorder(self, bits: int) -> None:
+        # Replaced rather than changed in place, so a lookup already iterating
+        # the old list is not disturbed.
+        self._probe_order[bits] = sorted(self._networks[bits].items(), key=lambda item: -item[0])
+
+    def _find(self, network: int, mask_length: int, bits: int) -> Optional[TrieNode]:
+        current = self.roots[bits]
+        for shift in range(bits - 1, bits - 1 - mask_length, -1):
+            self.analyzer.record_comparison()
+            current = current.children[(network >> shift) & 1]
+            if current is None:
+                return None
+
+        return current if current.mask_length == mask_length else None
 
     @measure_performance("contains")
     def contains_prefix(self, prefix: str) -> bool:
-        network_addr, mask_length = self._get_network_and_mask(prefix)
-        binary_ip = self._ip_to_binary(network_addr)
+        node = self._find(*self._get_network_and_mask(prefix))
+        return node is not None and node.is_end
+
+    def _staged_copy(self) -> 'IPTrie':
+        version = self._version
+        staged = copy.copy(self)
+        staged._version = TrieVersion(
+            roots=dict(version.roots),
+            prefixes=list(version.prefixes),
+            keys=list(version.keys),
+            free_ids=list(version.free_ids),
+            networks={bits: {length: dict(table) for length, table in tables.items()}
+                      for bits, tables in version.networks.items()},
+            probe_order={},
+            interval_indexes={},
+        )
+        for bits in staged._networks:
+            staged._reorder(bits)
+        # The transaction already holds the trie's lock; the copy is private to it.
+        staged._write_lock = threading.Lock()
+        return staged
+
+    def _publish(self, staged: 'IPTrie') -> None:
+        self._version = staged._version
+
+    @contextmanager
+    def transaction(self) -> Iterator['TrieTransaction']:
+        """Apply a batch of changes that readers see all at once, or not at all.
+
+        The batch is committed when the block exits normally and dropped if it
+        raises. Only one transaction, or direct insert/update/delete, runs at
+        a time.
+        """
+        with self._write_lock:
+            batch = TrieTransaction(self)
+            yield batch
+            batch.commit()
 
-        current = self.root
-        for i in range(mask_length):
-            self.analyzer.record_comparison()
-            bit = int(binary_ip[i])
-            if bit not in current.children:
-                return False
-            current = current.children[bit]
+    @measure_performance("match")
+    def match_ip(self, ip: IPKey) -> Optional[str]:
+        value, bits = ip_to_int(ip)
+        node = self._match(value, bits)
+        return node.prefix if node is not None else None
 
-        return current.is_end and current.mask_length == mask_length
+    @measure_performance("match")
+    def match_int(self, value: int, bits: int = 32) -> Optional[str]:
+        node = self._match(value, bits)
+        return node.prefix if node is not None else None
 
     @measure_performance("match")
-    def match_ip(self, ip: str) -> Optional[str]:
-        binary_ip = self._ip_to_binary(ip)
+    def match_id(self, ip: IPKey) -> int:
+        """Id of the longest matching prefix, -1 if none.
 
-        current = self.root
-        matched_prefix = None
+        Lets callers keep per-prefix data in their own table indexed like
+        ``prefixes`` instead of storing it as the payload.
+        """
+        node = self._match(*ip_to_int(ip))
+        return node.prefix_id if node is not None else -1
 
-        for i in range(len(binary_ip)):
-            self.analyzer.record_comparison()
+    @measure_performance("match")
+    def match_payload(self, ip: IPKey, default: Any = None) -> Any:
+        node = self._match(*ip_to_int(ip))
+        return node.payload if node is not None else default
+
+    def _match(self, value: int, bits: int) -> Optional[TrieNode]:
+        # One dict probe per stored mask length, longest first; the first hit
+        # is the longest match. Comparison counts are probes, not bits.
+        matched = None
+        probes = 0
+        for length, table in self._version.probe_order[bits]:
+            probes += 1
+            matched = table.get(value >> (bits - length))
+            if matched is not None:
+                break
 
-            if current.is_end:
-                matched_prefix = current.prefix
+        self.analyzer.record_comparisons(probes)
+        return matched
+
+    @measure_performance("covering")
+    def covering_prefixes(self, ip: IPKey) -> List[Tuple[str, Any]]:
+        """Every stored prefix containing ``ip`` with its payload, shortest first."""
+        return [(node.prefix, node.payload) for node in self._covering(*ip_to_int(ip))]
+
+    def _covering(self, value: int, bits: int) -> List[TrieNode]:
+        current = self.roots[bits]
+        covering = []
+        shift = bits
 
-            bit = int(binary_ip[i])
-            if bit not in current.children:
+        while current is not None:
+            if current.is_end:
+                covering.append(current)
+            shift -= 1
+            if shift < 0:
                 break
-            current = current.children[bit]
+            current = current.children[(value >> shift) & 1]
 
-        if current.is_end:
-            matched_prefix = current.prefix
+        self.analyzer.record_comparisons(bits - max(shift, 0))
+        return covering
 
-        return matched_prefix
+    @measure_performance("more_specifics")
+    def more_specifics(self, prefix: str) -> List[Tuple[str, Any]]:
+        """``prefix`` itself, if stored, and every stored prefix inside it, in address order."""
+        network, mask_length, bits = self._get_network_and_mask(prefix)
+        top = self._subtree(network, mask_length, bits)
+
+        found = []
+        stack = [top] if top is not None else []
+        while stack:
+            node = stack.pop()
+            self.analyzer.record_comparison()
+            if node.is_end:
+                found.append((node.prefix, node.payload))
+            for child in reversed(node.children):
+                if child is not None:
+                    stack.append(child)
+        return found
+
+    def _subtree(self, network: int, mask_length: int, bits: int) -> Optional[TrieNode]:
+        """Topmost node whose subtree holds exactly the prefixes inside ``network/mask_length``."""
+        current = self.roots[bits]
+        for shift in range(bits - 1, bits - 1 - mask_length, -1):
+            self.analyzer.record_comparison()
+            current = current.children[(network >> shift) & 1]
+            if current is None:
+                return None
+        return current
+
+    def node_count(self) -> int:
+        count = 0
+        stack = list(self.roots.values())
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(child for child in node.children if child is not None)
+        return count
+
+    def interval_index(self, bits: int = 32) -> IntervalIndex:
+        """Sorted-range view of one address family, rebuilt after the prefix set changes.
+
+        The cache and the keys come from one version, and writers swap in an
+        empty cache after changing the keys, so an index built here is only
+        stored where it is still current, even while a writer runs.
+        """
+        version = self._version
+        cache = version.interval_indexes
+        index = cache.get(bits)
+        if index is None:
+            keys = version.keys
+            entries = [(key[0], key[1], prefix_id) for prefix_id, key in enumerate(keys)
+                       if key is not None and key[2] == bits]
+            index = cache[bits] = IntervalIndex.from_prefixes(entries, bits)
+        return index
+
+    @measure_performance("match_many")
+    def match_many(self, addresses: np.ndarray) -> np.ndarray:
+        """Longest-prefix match for a whole batch, recorded as a single metric.
+
+        Takes a uint32 array of IPv4 addresses or an ``IPV6_DTYPE`` array of
+        IPv6 ones and returns the matching ids into ``self.prefixes`` (-1 for
+        no match).
+        """
+        addresses = np.asarray(addresses)
+        index = self.interval_index(128 if addresses.dtype.names else 32)
+        self.analyzer.record_comparisons(len(addresses) * len(index).bit_length())
+        return index.lookup_many(addresses)
+
+
+class TrieTransaction:
+    """Copy-on-write batch of changes to an IPTrie.
+
+    Each change copies the nodes on its path the first time it touches them
+    and leaves the live ones alone, so ``match_ip`` calls on the trie keep
+    walking the old table. ``commit`` then publishes the new TrieVersion
+    with a single assignment. Unchanged subtrees are shared by both versions.
+    """
+
+    def __init__(self, trie: IPTrie):
+        self.trie = trie
+        self.staged = trie._staged_copy()
+        fresh: Dict[int, Any] = {}
+
+        def writable(node):
+            if id(node) in fresh:
+                return node
+            clone = node.copy()
+            fresh[id(clone)] = clone
+            return clone
+
+        def created(node):
+            fresh[id(node)] = node
+            return node
+
+        self.staged._writable = writable
+        self.staged._created = created
+
+    def insert(self, prefix: str, payload: Any = None) -> None:
+        self.staged.insert(prefix, payload)
+
+    def update(self, prefix: str, payload: Any) -> None:
+        self.staged.update(prefix, payload)
+
+    def delete(self, prefix: str) -> bool:
+        return self.staged.delete(prefix)
+
+    def commit(self) -> None:
+        self.trie._publish(self.staged)
 
 
 class IPPrefixValidator:
@@ -101,12 +508,24 @@ class IPPrefixValidator:
             print(f"Error: {e}")
             return False
 
-    def add_prefix(self, prefix: str) -> None:
-        self.trie.insert(prefix)
+    def add_prefix(self, prefix: str, payload: Any = None) -> None:
+        self.trie.insert(prefix, payload)
+
+    def remove_prefix(self, prefix: str) -> bool:
+        return self.trie.delete(prefix)
 
-    def match_ip(self, ip: str) -> Optional[str]:
+    def match_ip(self, ip: IPKey) -> Optional[str]:
         return self.trie.match_ip(ip)
 
+    def match_many(self, addresses: np.ndarray) -> np.ndarray:
+        return self.trie.match_many(addresses)
+
+    def covering_prefixes(self, ip: IPKey) -> List[Tuple[str, Any]]:
+        return self.trie.covering_prefixes(ip)
+
+    def more_specifics(self, prefix: str) -> List[Tuple[str, Any]]:
+        return self.trie.more_specifics(prefix)
+
     def contains_prefix(self, prefix: str) -> bool:
         return self.trie.contains_prefix(prefix)
 
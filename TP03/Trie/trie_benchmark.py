@@ -0,0 +1,484 @@
+import gc
+import ipaddress
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from TP03.Grupo4.Ex2.Ex2 import IPv4Trie as Ex2IPv4Trie
+from TP03.Grupo4.Ex3.Ex3 import IPv6Trie as Ex3IPv6Trie
+from TP03.Grupo4.Ex4.Ex4 import IPv4Trie, PrefixSearchComparator
+from TP03.Trie.dir24_8 import Dir24_8Table
+from TP03.Trie.dual_stack_trie import DualStackTrie
+from TP03.Trie.mapped_trie import MappedIPTrie, save_trie
+from TP03.Trie.patricia_trie import PatriciaIPTrie
+from TP03.Trie.interval_index import to_ipv6_array
+from TP03.Trie.trie import IPTrie, ip_to_int
+from TP03.performance_analyzer.decorators import measure_performance, set_profiling_enabled
+
+# Rough shape of a public IPv4 routing table: mostly /24s, some shorter aggregates.
+PREFIX_LENGTH_WEIGHTS = {8: 1, 12: 1, 14: 2, 16: 8, 18: 4, 19: 6, 20: 8, 21: 8, 22: 14, 23: 12, 24: 60}
+
+
+class DictTrieNode:
+    def __init__(self):
+        self.children: Dict[int, 'DictTrieNode'] = {}
+        self.is_end: bool = False
+        self.prefix: Optional[str] = None
+        self.mask_length: Optional[int] = None
+
+
+class StringKeyIPTrie(IPTrie):
+    """Original dict-children trie walked over a '0'/'1' string, kept as a baseline."""
+
+    def __init__(self):
+        super().__init__()
+        self.root = DictTrieNode()
+
+    @measure_performance("insert")
+    def insert(self, prefix: str) -> None:
+        network = ipaddress.ip_network(prefix, strict=False)
+        binary_ip = self._ip_to_binary(str(network.network_address))
+
+        current = self.root
+        for i in range(network.prefixlen):
+            self.analyzer.record_comparison()
+            bit = int(binary_ip[i])
+            if bit not in current.children:
+                current.children[bit] = DictTrieNode()
+            current = current.children[bit]
+
+        current.is_end = True
+        current.prefix = prefix
+        current.mask_length = network.prefixlen
+
+    def _ip_to_binary(self, ip: str) -> str:
+        ip_obj = ipaddress.ip_address(ip)
+        if isinstance(ip_obj, ipaddress.IPv4Address):
+            return format(int(ip_obj), '032b')
+        else:
+            return format(int(ip_obj), '0128b')
+
+    @measure_performance("match")
+    def match_ip(self, ip: str) -> Optional[str]:
+        binary_ip = self._ip_to_binary(ip)
+
+        current = self.root
+        matched_prefix = None
+
+        for i in range(len(binary_ip)):
+            self.analyzer.record_comparison()
+
+            if current.is_end:
+                matched_prefix = current.prefix
+
+            bit = int(binary_ip[i])
+            if bit not in current.children:
+                break
+            current = current.children[bit]
+
+        if current.is_end:
+            matched_prefix = current.prefix
+
+        return matched_prefix
+
+
+def generate_prefixes(count: int, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    lengths = list(PREFIX_LENGTH_WEIGHTS)
+    weights = list(PREFIX_LENGTH_WEIGHTS.values())
+
+    prefixes = set()
+    while len(prefixes) < count:
+        mask = rng.choices(lengths, weights)[0]
+        network = (rng.randint(1, 223) << 24 | rng.getrandbits(24)) >> (32 - mask) << (32 - mask)
+        prefixes.add(f"{ipaddress.IPv4Address(network)}/{mask}")
+    return sorted(prefixes)
+
+
+def generate_ipv6_prefixes(count: int, seed: int = 42) -> List[str]:
+    """Mostly /48 customer allocations under a few hundred /32s, plus the /32s themselves."""
+    rng = random.Random(seed)
+    allocations = [0x2000 << 112 | rng.getrandbits(16) << 96 for _ in range(max(1, count // 100))]
+
+    prefixes = {f"{ipaddress.IPv6Address(block)}/32" for block in allocations}
+    while len(prefixes) < count:
+        block = rng.choice(allocations) | rng.getrandbits(16) << 80
+        prefixes.add(f"{ipaddress.IPv6Address(block)}/48")
+    return sorted(prefixes)
+
+
+def generate_addresses(prefixes: Sequence[str], count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    addresses = []
+    for _ in range(count):
+        network = ipaddress.ip_network(rng.choice(prefixes))
+        bits = network.max_prefixlen
+        if rng.random() < 0.9:
+            address = int(network.network_address) + rng.getrandbits(bits - network.prefixlen)
+        else:
+            address = rng.getrandbits(bits)
+        addresses.append(str(ipaddress.ip_address(address) if bits == 128 else ipaddress.IPv4Address(address)))
+    return addresses
+
+
+def lookups_per_second(lookup: Callable, keys: Sequence, repeats: int = 1) -> float:
+    """Best rate over ``repeats`` passes through ``keys``."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for key in keys:
+            lookup(key)
+        best = min(best, time.perf_counter() - start)
+    return len(keys) / best
+
+
+def build_and_measure(trie_class, prefixes: Sequence[str]):
+    """Build a trie and return it with the bytes it allocated."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    trie = trie_class()
+    for prefix in prefixes:
+        trie.insert(prefix)
+    trie.analyzer.metrics_history.clear()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return trie, used
+
+
+def run_integer_key_benchmark(num_prefixes: int = 100_000, num_lookups: int = 100_000,
+                              target: float = 5.0, repeats: int = 3) -> Dict[str, float]:
+    prefixes = generate_prefixes(num_prefixes)
+    addresses = generate_addresses(prefixes, num_lookups)
+    packed = [socket.inet_aton(address) for address in addresses]
+    integers = [int.from_bytes(address, 'big') for address in packed]
+
+    baseline = StringKeyIPTrie()
+    trie = IPTrie()
+    for prefix in prefixes:
+        baseline.insert(prefix)
+        trie.insert(prefix)
+
+    for address in addresses[:1000]:
+        assert baseline.match_ip(address) == trie.match_ip(address)
+
+    results = {}
+    for profiling in (True, False):
+        set_profiling_enabled(profiling)
+        mode = "profiling on" if profiling else "profiling off"
+        results[mode] = {
+            "string bits, str": lookups_per_second(baseline.match_ip, addresses, repeats),
+            "integer key, str": lookups_per_second(trie.match_ip, addresses, repeats),
+            "integer key, bytes": lookups_per_second(trie.match_ip, packed, repeats),
+            "integer key, int": lookups_per_second(trie.match_int, integers, repeats),
+        }
+    set_profiling_enabled(True)
+
+    # The target is checked with profiling off, like the other throughput
+    # benchmarks here; with it on, every call of both tries also pays the
+    # analyzer's fixed cost of a few microseconds.
+    print(f"\nIPTrie match_ip with {num_prefixes:,} prefixes, {num_lookups:,} lookups "
+          f"(target: {target:.0f}x the string-bit trie with profiling off)")
+    for mode, rates in results.items():
+        print(f"\n{mode}:")
+        reference = rates["string bits, str"]
+        for name, rate in rates.items():
+            verdict = ""
+            if mode == "profiling off" and name != "string bits, str":
+                verdict = "  met" if rate >= target * reference else "  MISSED"
+            print(f"{name:<22} {rate:>12,.0f} lookups/s  ({rate / reference:.1f}x){verdict}")
+    return results
+
+
+def run_patricia_benchmark(num_prefixes: int = 100_000, num_lookups: int = 100_000) -> Dict[str, Dict[str, float]]:
+    tables = {
+        "IPv4": generate_prefixes(num_prefixes),
+        "IPv6": generate_ipv6_prefixes(num_prefixes),
+    }
+
+    results = {}
+    for family, prefixes in tables.items():
+        addresses = generate_addresses(prefixes, num_lookups)
+        bitwise, bitwise_bytes = build_and_measure(IPTrie, prefixes)
+        patricia, patricia_bytes = build_and_measure(PatriciaIPTrie, prefixes)
+
+        for address in addresses[:1000]:
+            assert bitwise.match_ip(address) == patricia.match_ip(address)
+
+        set_profiling_enabled(False)
+        results[family] = {
+            "bitwise nodes": bitwise.node_count(),
+            "patricia nodes": patricia.node_count(),
+            "bitwise MiB": bitwise_bytes / 2 ** 20,
+            "patricia MiB": patricia_bytes / 2 ** 20,
+            "bitwise lookups/s": lookups_per_second(bitwise.match_ip, addresses),
+            "patricia lookups/s": lookups_per_second(patricia.match_ip, addresses),
+        }
+        set_profiling_enabled(True)
+        del bitwise, patricia
+
+    print(f"\nBitwise vs Patricia trie, {num_prefixes:,} prefixes per family (profiling off)")
+    print(f"{'':<20}" + "".join(f"{family:>16}" for family in results))
+    for metric in results["IPv4"]:
+        print(f"{metric:<20}" + "".join(f"{results[family][metric]:>16,.1f}" for family in results))
+    return results
+
+
+def run_dir24_8_benchmark(num_prefixes: int = 100_000, num_lookups: int = 100_000,
+                          num_linear_lookups: int = 20) -> Dict[str, float]:
+    prefixes = generate_prefixes(num_prefixes)
+    addresses = generate_addresses(prefixes, num_lookups)
+    integers = np.array([int.from_bytes(socket.inet_aton(address), 'big') for address in addresses],
+                        dtype=np.uint32)
+
+    comparator = PrefixSearchComparator()
+    comparator.prefix_list = prefixes
+    bitwise = IPTrie()
+    for prefix in prefixes:
+        bitwise.insert(prefix)
+        comparator.trie.insert(prefix)
+
+    start = time.perf_counter()
+    table = Dir24_8Table.from_trie(bitwise)
+    build_seconds = time.perf_counter() - start
+
+    for address in addresses[:1000]:
+        assert table.lookup(address) == bitwise.match_ip(address) == comparator.trie.search(address)
+
+    set_profiling_enabled(False)
+    start = time.perf_counter()
+    table.lookup_many(integers)
+    batch_rate = len(integers) / (time.perf_counter() - start)
+    results = {
+        "linear_search": lookups_per_second(comparator.linear_search, addresses[:num_linear_lookups]),
+        "Ex4 IPv4Trie.search": lookups_per_second(comparator.trie.search, addresses),
+        "IPTrie.match_ip": lookups_per_second(bitwise.match_ip, addresses),
+        "Dir24_8Table.lookup": lookups_per_second(table.lookup, addresses),
+        "Dir24_8Table.lookup_many": batch_rate,
+    }
+    set_profiling_enabled(True)
+
+    print(f"\nDIR-24-8 vs tries, {num_prefixes:,} prefixes (profiling off), "
+          f"table built from the trie in {build_seconds:.1f}s")
+    reference = results["linear_search"]
+    for name, rate in results.items():
+        print(f"{name:<26} {rate:>14,.0f} lookups/s  ({rate / reference:,.0f}x linear)")
+    return results
+
+
+def run_match_many_benchmark(num_prefixes: int = 100_000, num_addresses: int = 1_000_000) -> Dict[str, float]:
+    prefixes = generate_prefixes(num_prefixes)
+    trie = IPTrie()
+    for prefix in prefixes:
+        trie.insert(prefix)
+
+    addresses = generate_addresses(prefixes, num_addresses)
+    integers = np.array([int.from_bytes(socket.inet_aton(address), 'big') for address in addresses],
+                        dtype=np.uint32)
+
+    start = time.perf_counter()
+    trie.interval_index(32)
+    index_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ids = trie.match_many(integers)
+    batch_rate = len(integers) / (time.perf_counter() - start)
+    for address, prefix_id in zip(addresses[:1000], ids[:1000]):
+        assert trie.match_ip(address) == (trie.prefixes[prefix_id] if prefix_id >= 0 else None)
+
+    results = {
+        "match_ip, one call each": lookups_per_second(trie.match_ip, addresses[:100_000]),
+        "match_many, one batch": batch_rate,
+    }
+    print(f"\nBatch matching, {num_prefixes:,} prefixes, {num_addresses:,} addresses "
+          f"(interval index built in {index_seconds:.2f}s)")
+    for name, rate in results.items():
+        print(f"{name:<26} {rate:>14,.0f} lookups/s")
+    return results
+
+
+def run_concurrent_match_many_check(num_prefixes: int = 20_000, rounds: int = 20,
+                                    changes_per_round: int = 200, num_addresses: int = 20_000) -> int:
+    """Call ``match_many`` while another thread inserts, deletes and commits transactions.
+
+    Once the writer has finished a round, the batch answer must agree with
+    ``match_ip`` again: a stale interval index left in the cache would keep
+    returning the old prefix ids. Returns the number of batches run
+    alongside the writer.
+    """
+    prefixes = generate_prefixes(num_prefixes)
+    stored, spare = prefixes[::2], prefixes[1::2]
+    trie = IPTrie()
+    for prefix in stored:
+        trie.insert(prefix)
+
+    addresses = generate_addresses(prefixes, num_addresses)
+    integers = np.array([int.from_bytes(socket.inet_aton(address), 'big') for address in addresses],
+                        dtype=np.uint32)
+    rng = random.Random(3)
+    batches = 0
+
+    def writer(round_number: int) -> None:
+        for _ in range(changes_per_round):
+            prefix = rng.choice(spare)
+            if round_number % 2:
+                with trie.transaction() as batch:
+                    if not batch.delete(prefix):
+                        batch.insert(prefix)
+            elif not trie.delete(prefix):
+                trie.insert(prefix)
+
+    for round_number in range(rounds):
+        thread = threading.Thread(target=writer, args=(round_number,))
+        thread.start()
+        while thread.is_alive():
+            trie.match_many(integers)
+            batches += 1
+        thread.join()
+
+        ids = trie.match_many(integers)
+        for address, prefix_id in zip(addresses[:2000], ids[:2000].tolist()):
+            expected = trie.match_ip(address)
+            found = trie.prefixes[prefix_id] if prefix_id >= 0 else None
+            assert found == expected, f"round {round_number}: match_many gave {found}, match_ip {expected}"
+
+    print(f"\nmatch_many alongside a writer: {batches:,} batches over {rounds} rounds, "
+          f"results current after every round")
+    return batches
+
+
+def run_mmap_startup_benchmark(num_prefixes: int = 500_000, num_lookups: int = 100_000) -> Dict[str, float]:
+    prefixes = generate_prefixes(num_prefixes)
+    addresses = generate_addresses(prefixes, num_lookups)
+
+    start = time.perf_counter()
+    trie = PatriciaIPTrie()
+    for prefix in prefixes:
+        trie.insert(prefix)
+    trie.match_ip(addresses[0])
+    build_seconds = time.perf_counter() - start
+
+    path = os.path.join(tempfile.mkdtemp(), 'prefixes.trie')
+    start = time.perf_counter()
+    save_trie(trie, path)
+    save_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mapped = MappedIPTrie(path)
+    mapped.match_ip(addresses[0])
+    open_seconds = time.perf_counter() - start
+
+    for address in addresses[:1000]:
+        assert mapped.match_ip(address) == trie.match_ip(address)
+
+    set_profiling_enabled(False)
+    results = {
+        "insert + first lookup (s)": build_seconds,
+        "save_trie (s)": save_seconds,
+        "mmap open + first lookup (s)": open_seconds,
+        "file size (MiB)": os.path.getsize(path) / 2 ** 20,
+        "in-memory lookups/s": lookups_per_second(trie.match_ip, addresses),
+        "mapped lookups/s": lookups_per_second(mapped.match_ip, addresses),
+    }
+    set_profiling_enabled(True)
+    mapped.close()
+    os.remove(path)
+
+    print(f"\nStartup with {num_prefixes:,} prefixes")
+    for name, value in results.items():
+        print(f"{name:<30} {value:>14,.3f}")
+    return results
+
+
+def run_dual_stack_benchmark(num_prefixes: int = 50_000, num_lookups: int = 100_000,
+                             repeats: int = 3) -> Dict[str, Dict[str, float]]:
+    """DualStackTrie against every single-family trie in the repo, per address family.
+
+    Every engine answers the same address sample, and each rate is the best
+    of ``repeats`` passes. DualStackTrie passes on a family when it is at
+    least as fast as the best single-family engine.
+    """
+    engines = {
+        "IPv4": {
+            "Ex2 IPv4Trie": (Ex2IPv4Trie, lambda trie: trie.longest_prefix_match),
+            "Ex4 IPv4Trie": (IPv4Trie, lambda trie: trie.search),
+            "IPTrie": (IPTrie, lambda trie: trie.match_ip),
+            "PatriciaIPTrie": (PatriciaIPTrie, lambda trie: trie.match_ip),
+            "DualStackTrie": (DualStackTrie, lambda trie: trie.match),
+        },
+        "IPv6": {
+            "Ex3 IPv6Trie": (Ex3IPv6Trie, lambda trie: trie.longest_prefix_match),
+            "IPTrie": (IPTrie, lambda trie: trie.match_ip),
+            "PatriciaIPTrie": (PatriciaIPTrie, lambda trie: trie.match_ip),
+            "DualStackTrie": (DualStackTrie, lambda trie: trie.match),
+        },
+    }
+    tables = {
+        "IPv4": generate_prefixes(num_prefixes),
+        "IPv6": generate_ipv6_prefixes(num_prefixes),
+    }
+
+    results = {}
+    for family, prefixes in tables.items():
+        addresses = generate_addresses(prefixes, num_lookups)
+        results[family] = {}
+        expected = None
+        for name, (trie_class, matcher) in engines[family].items():
+            trie, used = build_and_measure(trie_class, prefixes)
+            match = matcher(trie)
+            found = [match(address) for address in addresses[:1000]]
+            assert expected is None or found == expected, name
+            expected = found
+
+            set_profiling_enabled(False)
+            results[family][name] = {
+                "MiB": used / 2 ** 20,
+                "lookups/s": lookups_per_second(match, addresses, repeats),
+            }
+            set_profiling_enabled(True)
+            if isinstance(trie, DualStackTrie):
+                dual_stack = trie
+            del trie, match
+
+        values = [ip_to_int(address)[0] for address in addresses]
+        batch = (np.array(values, dtype=np.uint32) if family == "IPv4" else to_ipv6_array(values))
+        dual_stack.interval_index(32 if family == "IPv4" else 128)
+        set_profiling_enabled(False)
+        results[family]["DualStackTrie.match_many"] = {
+            "lookups/s": lookups_per_second(dual_stack.match_many, [batch], repeats) * len(batch),
+        }
+        set_profiling_enabled(True)
+        del dual_stack
+
+    print(f"\nDual-stack engine vs single-family tries, {num_prefixes:,} prefixes per family "
+          f"(profiling off, best of {repeats})")
+    for family, rates in results.items():
+        print(f"\n{family}:")
+        best = max(rate["lookups/s"] for name, rate in rates.items()
+                   if not name.startswith("DualStackTrie"))
+        for name, rate in rates.items():
+            memory = f"  {rate['MiB']:>8.1f} MiB" if "MiB" in rate else ""
+            verdict = ""
+            if name.startswith("DualStackTrie"):
+                verdict = "  pass" if rate["lookups/s"] >= best else "  FAIL"
+            print(f"{name:<26} {rate['lookups/s']:>14,.0f} lookups/s  "
+                  f"({rate['lookups/s'] / best:.2f}x best){memory}{verdict}")
+    return results
+
+
+if __name__ == "__main__":
+    run_integer_key_benchmark()
+    run_patricia_benchmark()
+    run_dir24_8_benchmark()
+    run_match_many_benchmark()
+    run_concurrent_match_many_check()
+    run_mmap_startup_benchmark()
+    run_dual_stack_benchmark()
@@ -0,0 +1,298 @@
+from array import array
+from typing import List, Iterator, Optional
+
+from TP03.performance_analyzer.decorators import measure_performance
+from .binary_search_tree import BinarySearchTree
+
+NIL = -1
+
+
+class ArrayBinarySearchTree(BinarySearchTree):
+    """BinarySearchTree stored as parallel arrays instead of node objects.
+
+    Node ``i`` is ``values[i]`` with children ``left[i]`` / ``right[i]``
+    (``NIL`` when absent) and subtree size ``sizes[i]``. Values live in an
+    ``array('q')``, so keys must fit in a signed 64-bit integer. Deleted slots
+    are recycled through a free list.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.root: int = NIL
+        self.values = array('q')
+        self.left = array('i')
+        self.right = array('i')
+        self.sizes = array('i')
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return self.sizes[self.root] if self.root != NIL else 0
+
+    def _new_node(self, value: int) -> int:
+        if self._free:
+            index = self._free.pop()
+            self.values[index] = value
+            self.left[index] = NIL
+            self.right[index] = NIL
+            self.sizes[index] = 1
+            return index
+
+        self.values.append(value)
+        self.left.append(NIL)
+        self.right.append(NIL)
+        self.sizes.append(1)
+        return len(self.values) - 1
+
+    def _build_balanced(self, values: List[int], low: int, high: int) -> int:
+        if low > high:
+            return NIL
+
+        middle = (low + high) // 2
+        index = self._new_node(values[middle])
+        left = self._build_balanced(values, low, middle - 1)
+        right = self._build_balanced(values, middle + 1, high)
+        self.left[index] = left
+        self.right[index] = right
+        self.sizes[index] = high - low + 1
+        return index
+
+    def _search_iterative(self, value: int, path: List[int]) -> bool:
+        values, left, right = self.values, self.left, self.right
+        index = self.root
+        while index != NIL:
+            self.analyzer.record_comparison()
+            current = values[index]
+            path.append(current)
+
+            if value == current:
+                return True
+            index = left[index] if value < current else right[index]
+        return False
+
+    @measure_performance("insert")
+    def insert(self, value: int) -> None:
+        if self.root == NIL:
+            self.root = self._new_node(value)
+        else:
+            self._insert_iterative(value)
+
+    def _insert_iterative(self, value: int) -> int:
+        values, left, right, sizes = self.values, self.left, self.right, self.sizes
+        index = self.root
+        while True:
+            self.analyzer.record_comparison()
+            sizes[index] += 1
+            if value < values[index]:
+                if left[index] == NIL:
+                    child = self._new_node(value)
+                    left[index] = child
+                    return child
+                index = left[index]
+            else:
+                if right[index] == NIL:
+                    child = self._new_node(value)
+                    right[index] = child
+                    return child
+                index = right[index]
+
+    def _delete_iterative(self, value: int) -> bool:
+        values, left, right, sizes = self.values, self.left, self.right, self.sizes
+        ancestors = []
+        index = self.root
+        while index != NIL:
+            self.analyzer.record_comparison()
+            if value == values[index]:
+                break
+            ancestors.append(index)
+            index = left[index] if value < values[index] else right[index]
+
+        if index == NIL:
+            return False
+
+        if left[index] != NIL and right[index] != NIL:
+            ancestors.append(index)
+            successor = right[index]
+            while left[successor] != NIL:
+                self.analyzer.record_comparison()
+                ancestors.append(successor)
+                successor = left[successor]
+            values[index] = values[successor]
+            index = successor
+
+        child = left[index] if left[index] != NIL else right[index]
+        if not ancestors:
+            self.root = child
+        elif left[ancestors[-1]] == index:
+            left[ancestors[-1]] = child
+        else:
+            right[ancestors[-1]] = child
+
+        for ancestor in ancestors:
+            sizes[ancestor] -= 1
+        self._free.append(index)
+        return True
+
+    def iter_inorder(self) -> Iterator[int]:
+        values, left, right = self.values, self.left, self.right
+        stack = []
+        index = self.root
+        while stack or index != NIL:
+            while index != NIL:
+                stack.append(index)
+                index = left[index]
+            index = stack.pop()
+            self.analyzer.record_comparison()
+            yield values[index]
+            index = right[index]
+
+    def iter_preorder(self) -> Iterator[int]:
+        values, left, right = self.values, self.left, self.right
+        stack = [self.root] if self.root != NIL else []
+        while stack:
+            index = stack.pop()
+            self.analyzer.record_comparison()
+            yield values[index]
+            if right[index] != NIL:
+                stack.append(right[index])
+            if left[index] != NIL:
+                stack.append(left[index])
+
+    def iter_postorder(self) -> Iterator[int]:
+        values, left, right = self.values, self.left, self.right
+        stack = []
+        last_visited = NIL
+        index = self.root
+        while stack or index != NIL:
+            if index != NIL:
+                stack.append(index)
+                index = left[index]
+                continue
+
+            top = stack[-1]
+            if right[top] != NIL and right[top] != last_visited:
+                index = right[top]
+            else:
+                stack.pop()
+                self.analyzer.record_comparison()
+                yield values[top]
+                last_visited = top
+
+    @measure_performance("range_query")
+    def range_query(self, low: int, high: int) -> List[int]:
+        values, left, right = self.values, self.left, self.right
+        result = []
+        stack = []
+        index = self.root
+        while stack or index != NIL:
+            while index != NIL:
+                self.analyzer.record_comparison()
+                if values[index] < low:
+                    index = right[index]
+                else:
+                    stack.append(index)
+                    index = left[index]
+
+            if not stack:
+                break
+            index = stack.pop()
+            if values[index] > high:
+                break
+            result.append(values[index])
+            index = right[index]
+        return result
+
+    @measure_performance("rank")
+    def rank(self, value: int) -> int:
+        values, left, right, sizes = self.values, self.left, self.right, self.sizes
+        smaller = 0
+        index = self.root
+        while index != NIL:
+            self.analyzer.record_comparison()
+            if value <= values[index]:
+                index = left[index]
+            else:
+                if left[index] != NIL:
+                    smaller += sizes[left[index]]
+                smaller += 1
+                index = right[index]
+        return smaller
+
+    @measure_performance("select")
+    def select(self, k: int) -> int:
+        if not 0 <= k < len(self):
+            raise IndexError(f"select index {k} out of range for tree of size {len(self)}")
+
+        values, left, right, sizes = self.values, self.left, self.right, self.sizes
+        index = self.root
+        while True:
+            self.analyzer.record_comparison()
+            left_size = sizes[left[index]] if left[index] != NIL else 0
+            if k < left_size:
+                index = left[index]
+            elif k == left_size:
+                return values[index]
+            else:
+                k -= left_size + 1
+                index = right[index]
+
+    @measure_performance("floor")
+    def floor(self, value: int) -> Optional[int]:
+        values, left, right = self.values, self.left, self.right
+        best = None
+        index = self.root
+        while index != NIL:
+            self.analyzer.record_comparison()
+            current = values[index]
+            if value == current:
+                return current
+            if value < current:
+                index = left[index]
+            else:
+                best = current
+                index = right[index]
+        return best
+
+    @measure_performance("ceiling")
+    def ceiling(self, value: int) -> Optional[int]:
+        values, left, right = self.values, self.left, self.right
+        best = None
+        index = self.root
+        while index != NIL:
+            self.analyzer.record_comparison()
+            current = values[index]
+            if value == current:
+                return current
+            if value > current:
+                index = right[index]
+            else:
+                best = current
+                index = left[index]
+        return best
+
+    @measure_performance("successor")
+    def successor(self, value: int) -> Optional[int]:
+        values, left, right = self.values, self.left, self.right
+        best = None
+        index = self.root
+        while index != NIL:
+            self.analyzer.record_comparison()
+            if value < values[index]:
+                best = values[index]
+                index = left[index]
+            else:
+                index = right[index]
+        return best
+
+    @measure_performance("predecessor")
+    def predecessor(self, value: int) -> Optional[int]:
+        values, left, right = self.values, self.left, self.right
+        best = None
+        index = self.root
+        while index != NIL:
+            self.analyzer.record_comparison()
+            if value > values[index]:
+                best = values[index]
+                index = right[index]
+            else:
+                index = left[index]
+        return best
@@ -0,0 +1,111 @@
+from typing import Optional
+
+from TP03.performance_analyzer.decorators import measure_performance
+from .binary_search_tree import BinarySearchTree
+from .node import Node
+
+
+class AVLNode(Node):
+    __slots__ = ('height',)
+
+    def __init__(self, value: int):
+        super().__init__(value)
+        self.height: int = 1
+
+
+class AVLTree(BinarySearchTree):
+    """Self-balancing drop-in replacement for BinarySearchTree.
+
+    Every insert and delete rebalances the path back to the root, so the
+    height stays within ~1.44 * log2(n) even for sorted input. Searches and
+    traversals are inherited unchanged and keep the same comparison counts.
+    """
+
+    _node_type = AVLNode
+
+    @measure_performance("insert")
+    def insert(self, value: int) -> None:
+        self.root = self._insert_balanced(self.root, value)
+
+    def _insert_balanced(self, node: Optional[AVLNode], value: int) -> AVLNode:
+        if node is None:
+            return self._node_type(value)
+
+        self.analyzer.record_comparison()
+        if value < node.value:
+            node.left = self._insert_balanced(node.left, value)
+        else:
+            node.right = self._insert_balanced(node.right, value)
+
+        return self._rebalance(node)
+
+    @measure_performance("delete")
+    def delete(self, value: int) -> None:
+        self.root = self._delete_balanced(self.root, value)
+
+    def _delete_balanced(self, node: Optional[AVLNode], value: int) -> Optional[AVLNode]:
+        if not node:
+            return None
+
+        self.analyzer.record_comparison()
+        if value < node.value:
+            node.left = self._delete_balanced(node.left, value)
+        elif value > node.value:
+            node.right = self._delete_balanced(node.right, value)
+        else:
+            if not node.left:
+                return node.right
+            elif not node.right:
+                return node.left
+
+            successor_value = self._find_min_value(node.right)
+            node.value = successor_value
+            node.right = self._delete_balanced(node.right, successor_value)
+
+        return self._rebalance(node)
+
+    def height(self) -> int:
+        return self._height(self.root)
+
+    @staticmethod
+    def _height(node: Optional[AVLNode]) -> int:
+        return node.height if node else 0
+
+    def _update(self, node: AVLNode) -> None:
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+        node.size = 1 + self._size(node.left) + self._size(node.right)
+
+    def _balance_factor(self, node: AVLNode) -> int:
+        return self._height(node.left) - self._height(node.right)
+
+    def _rotate_left(self, node: AVLNode) -> AVLNode:
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_right(self, node: AVLNode) -> AVLNode:
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rebalance(self, node: AVLNode) -> AVLNode:
+        self._update(node)
+        balance = self._balance_factor(node)
+
+        if balance > 1:
+            if self._balance_factor(node.left) < 0:
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+
+        if balance < -1:
+            if self._balance_factor(node.right) > 0:
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+
+        return node
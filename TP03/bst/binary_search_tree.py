@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Tuple, Iterator, Iterable
 
 from TP03.performance_analyzer.analyzer import PerformanceAnalyzer
 from TP03.performance_analyzer.decorators import measure_performance
@@ -6,76 +6,130 @@ from .node import Node
 
 
 class BinarySearchTree:
+    _node_type = Node
+
     def __init__(self):
         self.root: Optional[Node] = None
         self.analyzer = PerformanceAnalyzer()
         self.tree_states: List[Dict] = []
 
+    @classmethod
+    def from_iterable(cls, values: Iterable[int], presorted: bool = False) -> 'BinarySearchTree':
+        tree = cls()
+        start_time = tree.analyzer.start_operation("bulk_load")
+
+        ordered = values if presorted and isinstance(values, list) else list(values)
+        if not presorted:
+            ordered.sort()
+        tree.root = tree._build_balanced(ordered, 0, len(ordered) - 1)
+
+        tree.analyzer.end_operation(
+            "bulk_load",
+            start_time,
+            len(ordered),
+            {"presorted": presorted}
+        )
+        return tree
+
+    def _build_balanced(self, values: List[int], low: int, high: int) -> Optional[Node]:
+        if low > high:
+            return None
+
+        middle = (low + high) // 2
+        node = self._node_type(values[middle])
+        node.left = self._build_balanced(values, low, middle - 1)
+        node.right = self._build_balanced(values, middle + 1, high)
+        self._update(node)
+        return node
+
+    def __len__(self) -> int:
+        return self._size(self.root)
+
+    @staticmethod
+    def _size(node: Optional[Node]) -> int:
+        return node.size if node else 0
+
+    def _update(self, node: Node) -> None:
+        node.size = 1 + self._size(node.left) + self._size(node.right)
+
     @measure_performance("search")
     def search(self, value: int) -> Tuple[bool, List[int]]:
         path = []
-        found = self._search_recursive(self.root, value, path)
+        found = self._search_iterative(value, path)
         return found, path
 
-    def _search_recursive(self, node: Optional[Node], value: int, path: List[int]) -> bool:
-        if not node:
-            return False
-
-        self.analyzer.record_comparison()
-        path.append(node.value)
+    def _search_iterative(self, value: int, path: List[int]) -> bool:
+        node = self.root
+        while node:
+            self.analyzer.record_comparison()
+            path.append(node.value)
 
-        if value == node.value:
-            return True
-        elif value < node.value:
-            return self._search_recursive(node.left, value, path)
-        else:
-            return self._search_recursive(node.right, value, path)
+            if value == node.value:
+                return True
+            node = node.left if value < node.value else node.right
+        return False
 
     @measure_performance("insert")
     def insert(self, value: int) -> None:
         if not self.root:
-            self.root = Node(value)
+            self.root = self._node_type(value)
         else:
-            self._insert_recursive(self.root, value)
+            self._insert_iterative(value)
 
-    def _insert_recursive(self, node: Node, value: int) -> Node:
-        self.analyzer.record_comparison()
-        if value < node.value:
-            if node.left is None:
-                node.left = Node(value)
-            else:
-                self._insert_recursive(node.left, value)
-        else:
-            if node.right is None:
-                node.right = Node(value)
+    def _insert_iterative(self, value: int) -> Node:
+        node = self.root
+        while True:
+            self.analyzer.record_comparison()
+            node.size += 1
+            if value < node.value:
+                if node.left is None:
+                    node.left = self._node_type(value)
+                    return node.left
+                node = node.left
             else:
-                self._insert_recursive(node.right, value)
-        return node
+                if node.right is None:
+                    node.right = self._node_type(value)
+                    return node.right
+                node = node.right
 
     @measure_performance("delete")
     def delete(self, value: int) -> None:
-        self.root = self._delete_recursive(self.root, value)
+        self._delete_iterative(value)
+
+    def _delete_iterative(self, value: int) -> bool:
+        ancestors = []
+        node = self.root
+        while node:
+            self.analyzer.record_comparison()
+            if value == node.value:
+                break
+            ancestors.append(node)
+            node = node.left if value < node.value else node.right
 
-    def _delete_recursive(self, node: Optional[Node], value: int) -> Optional[Node]:
         if not node:
-            return None
+            return False
 
-        self.analyzer.record_comparison()
-        if value < node.value:
-            node.left = self._delete_recursive(node.left, value)
-        elif value > node.value:
-            node.right = self._delete_recursive(node.right, value)
-        else:
-            if not node.left:
-                return node.right
-            elif not node.right:
-                return node.left
+        if node.left and node.right:
+            ancestors.append(node)
+            successor = node.right
+            while successor.left:
+                self.analyzer.record_comparison()
+                ancestors.append(successor)
+                successor = successor.left
+            node.value = successor.value
+            node = successor
 
-            successor_value = self._find_min_value(node.right)
-            node.value = successor_value
-            node.right = self._delete_recursive(node.right, successor_value)
+        child = node.left if node.left else node.right
+        if not ancestors:
+            self.root = child
+        elif ancestors[-1].left is node:
+            ancestors[-1].left = child
+        else:
+            ancestors[-1].right = child
 
-        return node
+        for ancestor in ancestors:
+            ancestor.size -= 1
+        return True
 
     def _find_min_value(self, node: Node) -> int:
         current = node
@@ -84,41 +138,165 @@ class BinarySearchTree:
             current = current.left
         return current.value
 
-    @measure_performance("inorder")
-    def inorder_traversal(self) -> List[int]:
-        result = []
-        self._inorder_recursive(self.root, result)
-        return result
+    def iter_inorder(self) -> Iterator[int]:
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            self.analyzer.record_comparison()
+            yield node.value
+            node = node.right
 
-    def _inorder_recursive(self, node: Optional[Node], result: List[int]):
-        if node:
+    def iter_preorder(self) -> Iterator[int]:
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
             self.analyzer.record_comparison()
-            self._inorder_recursive(node.left, result)
-            result.append(node.value)
-            self._inorder_recursive(node.right, result)
+            yield node.value
+            if node.right:
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
+
+    def iter_postorder(self) -> Iterator[int]:
+        stack = []
+        last_visited = None
+        node = self.root
+        while stack or node:
+            if node:
+                stack.append(node)
+                node = node.left
+                continue
+
+            top = stack[-1]
+            if top.right and top.right is not last_visited:
+                node = top.right
+            else:
+                stack.pop()
+                self.analyzer.record_comparison()
+                yield top.value
+                last_visited = top
+
+    @measure_performance("inorder")
+    def inorder_traversal(self) -> List[int]:
+        return list(self.iter_inorder())
 
     @measure_performance("preorder")
     def preorder_traversal(self) -> List[int]:
-        result = []
-        self._preorder_recursive(self.root, result)
-        return result
-
-    def _preorder_recursive(self, node: Optional[Node], result: List[int]):
-        if node:
-            self.analyzer.record_comparison()
-            result.append(node.value)
-            self._preorder_recursive(node.left, result)
-            self._preorder_recursive(node.right, result)
+        return list(self.iter_preorder())
 
     @measure_performance("postorder")
     def postorder_traversal(self) -> List[int]:
+        return list(self.iter_postorder())
+
+    @measure_performance("range_query")
+    def range_query(self, low: int, high: int) -> List[int]:
         result = []
-        self._postorder_recursive(self.root, result)
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                self.analyzer.record_comparison()
+                if node.value < low:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+
+            if not stack:
+                break
+            node = stack.pop()
+            if node.value > high:
+                break
+            result.append(node.value)
+            node = node.right
         return result
 
-    def _postorder_recursive(self, node: Optional[Node], result: List[int]):
-        if node:
+    @measure_performance("rank")
+    def rank(self, value: int) -> int:
+        smaller = 0
+        node = self.root
+        while node:
+            self.analyzer.record_comparison()
+            if value <= node.value:
+                node = node.left
+            else:
+                smaller += self._size(node.left) + 1
+                node = node.right
+        return smaller
+
+    @measure_performance("select")
+    def select(self, k: int) -> int:
+        if not 0 <= k < len(self):
+            raise IndexError(f"select index {k} out of range for tree of size {len(self)}")
+
+        node = self.root
+        while True:
+            self.analyzer.record_comparison()
+            left_size = self._size(node.left)
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node.value
+            else:
+                k -= left_size + 1
+                node = node.right
+
+    @measure_performance("floor")
+    def floor(self, value: int) -> Optional[int]:
+        best = None
+        node = self.root
+        while node:
+            self.analyzer.record_comparison()
+            if value == node.value:
+                return node.value
+            if value < node.value:
+                node = node.left
+            else:
+                best = node.value
+                node = node.right
+        return best
+
+    @measure_performance("ceiling")
+    def ceiling(self, value: int) -> Optional[int]:
+        best = None
+        node = self.root
+        while node:
+            self.analyzer.record_comparison()
+            if value == node.value:
+                return node.value
+            if value > node.value:
+                node = node.right
+            else:
+                best = node.value
+                node = node.left
+        return best
+
+    @measure_performance("successor")
+    def successor(self, value: int) -> Optional[int]:
+        best = None
+        node = self.root
+        while node:
             self.analyzer.record_comparison()
-            self._postorder_recursive(node.left, result)
-            self._postorder_recursive(node.right, result)
-            result.append(node.value)
\ No newline at end of file
+            if value < node.value:
+                best = node.value
+                node = node.left
+            else:
+                node = node.right
+        return best
+
+    @measure_performance("predecessor")
+    def predecessor(self, value: int) -> Optional[int]:
+        best = None
+        node = self.root
+        while node:
+            self.analyzer.record_comparison()
+            if value > node.value:
+                best = node.value
+                node = node.right
+            else:
+                node = node.left
+        return best
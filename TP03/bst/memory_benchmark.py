@@ -0,0 +1,59 @@
+import gc
+import random
+import tracemalloc
+from typing import Dict, Optional
+
+from TP03.bst.array_tree import ArrayBinarySearchTree
+from TP03.bst.binary_search_tree import BinarySearchTree
+
+
+class DictNode:
+    """Node layout used before __slots__ was introduced, kept for comparison."""
+
+    def __init__(self, value: int):
+        self.value = value
+        self.left: Optional[DictNode] = None
+        self.right: Optional[DictNode] = None
+        self.size: int = 1
+
+
+class DictNodeTree(BinarySearchTree):
+    _node_type = DictNode
+
+
+def measure_bytes_per_node(tree_class, size: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    values = random.sample(range(size * 10), size)
+    tree = tree_class.from_iterable(values)
+    del values
+    gc.collect()
+
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del tree
+    return used / size
+
+
+def run_memory_benchmark(sizes=(10_000, 100_000, 1_000_000)) -> Dict[str, Dict[int, float]]:
+    layouts = {
+        "dict nodes": DictNodeTree,
+        "slotted nodes": BinarySearchTree,
+        "parallel arrays": ArrayBinarySearchTree,
+    }
+
+    results = {name: {} for name in layouts}
+    print(f"\n{'Layout':<18}" + "".join(f"{size:>14,}" for size in sizes))
+    for name, tree_class in layouts.items():
+        for size in sizes:
+            results[name][size] = measure_bytes_per_node(tree_class, size)
+        print(f"{name:<18}" + "".join(f"{results[name][size]:>12.1f} B" for size in sizes))
+
+    return results
+
+
+if __name__ == "__main__":
+    run_memory_benchmark()
+    print("\nValues are bytes per node, including the key objects the layout keeps alive.")
@@ -1,7 +1,10 @@
 from typing import Optional
 
 class Node:
+    __slots__ = ('value', 'left', 'right', 'size')
+
     def __init__(self, value: int):
         self.value = value
         self.left: Optional[Node] = None
         self.right: Optional[Node] = None
+        self.size: int = 1
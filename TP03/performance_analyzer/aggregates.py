@@ -0,0 +1,98 @@
+import math
+from array import array
+from typing import Dict
+
+
+class LatencyHistogram:
+    """Log-linear (HDR-style) histogram of non-negative integer samples.
+
+    Values are bucketed by their top ``significant_bits`` bits, so every
+    recorded value is reproduced within a relative error of
+    ``2 ** -(significant_bits - 1)`` while the bucket array stays a fixed size
+    no matter how many samples are recorded.
+    """
+
+    def __init__(self, significant_bits: int = 7):
+        self.significant_bits = significant_bits
+        self._half = 1 << (significant_bits - 1)
+        self._counts = array('q', bytes(8 * (66 - significant_bits) * self._half))
+        self.total_count = 0
+
+    def _index(self, value: int) -> int:
+        exponent = value.bit_length() - self.significant_bits
+        if exponent <= 0:
+            return value
+        return exponent * self._half + (value >> exponent)
+
+    def _value_at(self, index: int) -> int:
+        if index < 2 * self._half:
+            return index
+        exponent = index // self._half - 1
+        mantissa = index - exponent * self._half
+        return (mantissa << exponent) + (1 << (exponent - 1))
+
+    def record(self, value: int) -> None:
+        self._counts[self._index(max(0, value))] += 1
+        self.total_count += 1
+
+    def percentile(self, percent: float) -> int:
+        if self.total_count == 0:
+            return 0
+
+        target = max(1, math.ceil(self.total_count * percent / 100.0))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            if count:
+                seen += count
+                if seen >= target:
+                    return self._value_at(index)
+        return 0
+
+
+class OperationStats:
+    """Constant-memory running aggregates for one operation name."""
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.count = 0
+        self.mean_time_ns = 0.0
+        self.min_time_ns = 0
+        self.max_time_ns = 0
+        self.total_time_ns = 0
+        self.total_comparisons = 0
+        self.total_elements = 0
+        self.max_memory_peak = 0
+        self.total_memory_net = 0
+        self.histogram = LatencyHistogram()
+
+    def record(self, time_ns: int, elements: int, comparisons: int,
+               memory_peak: int = 0, memory_net: int = 0) -> None:
+        self.count += 1
+        if self.count == 1 or time_ns < self.min_time_ns:
+            self.min_time_ns = time_ns
+        if time_ns > self.max_time_ns:
+            self.max_time_ns = time_ns
+        self.mean_time_ns += (time_ns - self.mean_time_ns) / self.count
+        self.total_time_ns += time_ns
+        self.total_comparisons += comparisons
+        self.total_elements += elements
+        if memory_peak > self.max_memory_peak:
+            self.max_memory_peak = memory_peak
+        self.total_memory_net += memory_net
+        self.histogram.record(time_ns)
+
+    def percentile_ns(self, percent: float) -> int:
+        return self.histogram.percentile(percent)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean_ms': self.mean_time_ns / 1e6,
+            'min_ms': self.min_time_ns / 1e6,
+            'max_ms': self.max_time_ns / 1e6,
+            'p50_ms': self.percentile_ns(50) / 1e6,
+            'p90_ms': self.percentile_ns(90) / 1e6,
+            'p99_ms': self.percentile_ns(99) / 1e6,
+            'mean_comparisons': self.total_comparisons / self.count if self.count else 0.0,
+            'max_memory_peak_kb': self.max_memory_peak / 1024,
+        }
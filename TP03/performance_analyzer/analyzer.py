@@ -1,38 +1,253 @@
 from dataclasses import dataclass
 from typing import Any, Dict, Tuple
 
+import threading
 import time
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import List, Dict, Any
-import numpy as np
+import tracemalloc
+from functools import wraps
+from typing import List, Dict, Any, Callable, Optional
+from .aggregates import OperationStats
 from .metrics import PerformanceMetrics
+from .ring_buffer import MetricsRingBuffer
 
+DEFAULT_HISTORY_CAPACITY = 100_000
+
+
+class _Span:
+    __slots__ = ('name', 'comparisons', 'merged', 'memory_start', 'child_peak')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.comparisons = 0
+        self.merged = 0
+        self.memory_start = 0
+        self.child_peak = 0
 
-class PerformanceAnalyzer:
 
+class _SpanStack(threading.local):
     def __init__(self):
-        self.metrics_history: List[PerformanceMetrics] = []
-        self._comparison_count = 0
+        self.spans: List[_Span] = []
+
+
+class PerformanceAnalyzer:
+    """Collects per-operation timings and comparison counts.
+
+    Operations nest: each thread keeps its own stack of open spans, so a
+    measured call made from inside another one gets its own count and that
+    count is also added to the caller's total. Worker threads should run
+    their tasks through ``bind`` so their comparisons are merged into the
+    span that submitted them.
+
+    With ``track_memory`` enabled every operation also records its peak and
+    net allocation in bytes, using tracemalloc. tracemalloc counts the whole
+    process, so memory figures of operations overlapping in other threads
+    are mixed together.
+    """
+
+    def __init__(self, enabled: bool = True, sample_every: int = 1,
+                 history_capacity: int = DEFAULT_HISTORY_CAPACITY, track_memory: bool = False):
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.metrics_history = MetricsRingBuffer(history_capacity)
+        self.stats: Dict[str, OperationStats] = {}
+        self.enabled = enabled
+        self.sample_every = sample_every
+        self._calls_seen = 0
+        self._local = _SpanStack()
+        self._lock = threading.Lock()
+        self._last_root: Optional[_Span] = None
+        self._listeners: List[Callable] = []
+        self.track_memory = False
+        self._started_tracemalloc = False
+        if track_memory:
+            self.enable_memory_tracking()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Copies sent to worker processes keep the recorded history but not
+        # the per-thread spans, the lock or listeners tied to this process.
+        state = self.__dict__.copy()
+        for name in ('_local', '_lock', '_last_root'):
+            del state[name]
+        state['_listeners'] = []
+        state['_started_tracemalloc'] = False
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._local = _SpanStack()
+        self._lock = threading.Lock()
+        self._last_root = None
+
+    def enable_memory_tracking(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+            self._started_tracemalloc = True
+        self.track_memory = True
 
-    def start_operation(self, operation_name: str) -> float:
-        self._comparison_count = 0
-        return time.time()
+    def disable_memory_tracking(self) -> None:
+        self.track_memory = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def add_listener(self, listener: Callable) -> None:
+        """Call ``listener(operation, time_ns, elements, comparisons, memory_peak,
+        memory_net, additional_metrics)`` for every operation recorded from now on.
+
+        Listeners run in the recording thread, outside the analyzer's lock, so
+        they may be called from several threads at once.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable) -> None:
+        with self._lock:
+            self._listeners.remove(listener)
+
+    def should_measure(self) -> bool:
+        if not self.enabled:
+            return False
+        if self.sample_every == 1:
+            return True
+        self._calls_seen += 1
+        return self._calls_seen % self.sample_every == 0
+
+    def start_operation(self, operation_name: str) -> int:
+        spans = self._local.spans
+        span = _Span(operation_name)
+        if not spans:
+            self._last_root = span
+        if self.track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if spans:
+                spans[-1].child_peak = max(spans[-1].child_peak, peak)
+            tracemalloc.reset_peak()
+            span.memory_start = current
+        spans.append(span)
+        return time.perf_counter_ns()
 
     def record_comparison(self):
-        self._comparison_count += 1
+        spans = self._local.spans
+        if spans:
+            spans[-1].comparisons += 1
+            return
+
+        # Thread that was not started through bind(): attribute the comparison
+        # to the most recent top-level operation, under the lock since that
+        # span may be owned by another thread.
+        root = self._last_root
+        if root is not None:
+            with self._lock:
+                root.merged += 1
+
+    def record_comparisons(self, count: int):
+        spans = self._local.spans
+        if spans:
+            spans[-1].comparisons += count
+            return
+
+        root = self._last_root
+        if root is not None:
+            with self._lock:
+                root.merged += count
+
+    def bind(self, func: Callable) -> Callable:
+        spans = self._local.spans
+        if not spans:
+            return func
+        parent = spans[-1]
+
+        @wraps(func)
+        def bound(*args, **kwargs):
+            worker_spans = self._local.spans
+            span = _Span(parent.name)
+            worker_spans.append(span)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                worker_spans.pop()
+                with self._lock:
+                    parent.merged += span.comparisons + span.merged
+
+        return bound
+
+    def _close_span(self) -> Tuple[int, int, int]:
+        spans = self._local.spans
+        if not spans:
+            return 0, 0, 0
+
+        span = spans.pop()
+        comparisons = span.comparisons + span.merged
 
-    def end_operation(self, operation_name: str, start_time: float,
+        memory_peak = memory_net = 0
+        if self.track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, span.child_peak)
+            memory_peak = max(0, peak - span.memory_start)
+            memory_net = current - span.memory_start
+            if spans:
+                spans[-1].child_peak = max(spans[-1].child_peak, peak)
+
+        if spans:
+            spans[-1].comparisons += comparisons
+        elif self._last_root is span:
+            self._last_root = None
+        return comparisons, memory_peak, memory_net
+
+    def discard_operation(self) -> None:
+        self._close_span()
+
+    def _store(self, operation_name: str, elapsed_ns: int, elements_processed: int,
+               comparisons: int, memory_peak: int, memory_net: int,
+               additional_metrics: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self.metrics_history.append(operation_name, elapsed_ns, elements_processed,
+                                        comparisons, additional_metrics,
+                                        memory_peak, memory_net)
+
+            stats = self.stats.get(operation_name)
+            if stats is None:
+                stats = self.stats[operation_name] = OperationStats(operation_name)
+            stats.record(elapsed_ns, elements_processed, comparisons, memory_peak, memory_net)
+            listeners = tuple(self._listeners)
+
+        # Listeners may do file or network I/O; call them outside the lock so
+        # other threads can keep recording meanwhile.
+        for listener in listeners:
+            listener(operation_name, elapsed_ns, elements_processed, comparisons,
+                     memory_peak, memory_net, additional_metrics)
+
+    def record_operation(self, operation_name: str, start_time: int,
+                         elements_processed: int, additional_metrics: Dict[str, Any] = None) -> int:
+        elapsed_ns = time.perf_counter_ns() - start_time
+        comparisons, memory_peak, memory_net = self._close_span()
+        self._store(operation_name, elapsed_ns, elements_processed, comparisons,
+                    memory_peak, memory_net, additional_metrics)
+        return elapsed_ns
+
+    def end_operation(self, operation_name: str, start_time: int,
                       elements_processed: int, additional_metrics: Dict[str, Any] = None) -> PerformanceMetrics:
-        metrics = PerformanceMetrics(
+        elapsed_ns = time.perf_counter_ns() - start_time
+        comparisons, memory_peak, memory_net = self._close_span()
+        self._store(operation_name, elapsed_ns, elements_processed, comparisons,
+                    memory_peak, memory_net, additional_metrics)
+        return PerformanceMetrics(
             operation=operation_name,
-            time_taken=time.time() - start_time,
+            time_taken=elapsed_ns / 1e9,
             elements_processed=elements_processed,
-            comparisons=self._comparison_count,
-            additional_metrics=additional_metrics
+            comparisons=comparisons,
+            memory_used=memory_peak,
+            additional_metrics=additional_metrics,
+            memory_net=memory_net
         )
-        self.metrics_history.append(metrics)
-        return metrics
+
+    def operation_stats(self) -> List[OperationStats]:
+        with self._lock:
+            return list(self.stats.values())
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: stats.summary() for name, stats in self.stats.items()}
 
 
 class PerformanceVisualizer:
@@ -42,6 +257,8 @@ class PerformanceVisualizer:
                                plot_type: str = 'line',
                                title: str = 'Performance Analysis',
                                figsize: Tuple[float, float] = (15.0, 8.0)):
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=figsize)
 
         operations = {}
@@ -50,11 +267,13 @@ class PerformanceVisualizer:
                 operations[metric.operation] = {
                     'times': [],
                     'comparisons': [],
-                    'elements': []
+                    'elements': [],
+                    'memory': []
                 }
             operations[metric.operation]['times'].append(metric.time_taken * 1000)  # ms
             operations[metric.operation]['comparisons'].append(metric.comparisons)
             operations[metric.operation]['elements'].append(metric.elements_processed)
+            operations[metric.operation]['memory'].append(metric.memory_used / 1024)  # KiB
 
         if plot_type == 'line':
             PerformanceVisualizer._create_line_plot(operations, title)
@@ -64,6 +283,8 @@ class PerformanceVisualizer:
             PerformanceVisualizer._create_candlestick_plot(operations, title)
         elif plot_type == 'heatmap':
             PerformanceVisualizer._create_heatmap_plot(operations, title)
+        elif plot_type == 'memory':
+            PerformanceVisualizer._create_memory_plot(operations, title)
 
         plt.tight_layout()
         plt.savefig(f'performance_{plot_type}_{title.lower().replace(" ", "_")}.png')
@@ -71,6 +292,8 @@ class PerformanceVisualizer:
 
     @staticmethod
     def _create_line_plot(operations: Dict, title: str):
+        import matplotlib.pyplot as plt
+
         plt.subplot(2, 1, 1)
         for op_name, op_data in operations.items():
             plt.plot(op_data['times'], label=f'{op_name} (time)')
@@ -87,6 +310,9 @@ class PerformanceVisualizer:
 
     @staticmethod
     def _create_bar_plot(operations: Dict, title: str):
+        import matplotlib.pyplot as plt
+        import numpy as np
+
         avg_times = []
         avg_comparisons = []
         labels = []
@@ -114,19 +340,25 @@ class PerformanceVisualizer:
 
     @staticmethod
     def _create_candlestick_plot(operations: Dict, title: str):
+        import matplotlib.pyplot as plt
+
         plt.subplot(2, 1, 1)
         data_times = [op_data['times'] for op_data in operations.values()]
-        plt.boxplot(data_times, labels=operations.keys())
+        plt.boxplot(data_times, tick_labels=list(operations.keys()))
         plt.ylabel('Time (ms)')
         plt.title(f'{title} - Performance distribution')
 
         plt.subplot(2, 1, 2)
         data_comps = [op_data['comparisons'] for op_data in operations.values()]
-        plt.boxplot(data_comps, labels=operations.keys())
+        plt.boxplot(data_comps, tick_labels=list(operations.keys()))
         plt.ylabel('Comparisons number')
 
     @staticmethod
     def _create_heatmap_plot(operations: Dict, title: str):
+        import matplotlib.pyplot as plt
+        import numpy as np
+        import seaborn as sns
+
         metrics_matrix = []
         for op_name, op_data in operations.items():
             metrics_matrix.append([
@@ -141,4 +373,25 @@ class PerformanceVisualizer:
                     yticklabels=list(operations.keys()),
                     annot=True,
                     fmt='.2f',
-                    cmap='YlOrRd')
\ No newline at end of file
+                    cmap='YlOrRd')
+
+    @staticmethod
+    def _create_memory_plot(operations: Dict, title: str):
+        import matplotlib.pyplot as plt
+        import numpy as np
+
+        plt.subplot(2, 1, 1)
+        for op_name, op_data in operations.items():
+            plt.plot(op_data['memory'], label=f'{op_name} (peak)')
+        plt.ylabel('Peak allocation (KiB)')
+        plt.title(f'{title} - Memory usage')
+        plt.legend()
+
+        labels = list(operations.keys())
+        x = np.arange(len(labels))
+        plt.subplot(2, 1, 2)
+        plt.bar(x, [np.mean(op_data['memory']) for op_data in operations.values()],
+                label='Average peak (KiB)')
+        plt.xticks(x, labels)
+        plt.ylabel('Peak allocation (KiB)')
+        plt.legend()
@@ -1,31 +1,62 @@
+import os
+from collections.abc import Sized
 from functools import wraps
-from typing import Iterable
 
+PROFILING_ENV_VAR = "PERF_PROFILING"
 
-def measure_performance(operation_name: str = None):
+# Read once at import: when profiling is switched off here, measure_performance
+# returns the undecorated function and the hot path pays nothing at all.
+_decoration_enabled = os.environ.get(PROFILING_ENV_VAR, "1").lower() not in ("0", "off", "false", "no")
+_runtime_enabled = True
+
+_SCALAR_TYPES = (int, float, str, bytes)
+
+
+def set_profiling_enabled(enabled: bool) -> None:
+    global _runtime_enabled
+    _runtime_enabled = enabled
+
+
+def is_profiling_enabled() -> bool:
+    return _decoration_enabled and _runtime_enabled
+
+
+def _count_elements(args) -> int:
+    if args:
+        first_arg = args[0]
+        if isinstance(first_arg, _SCALAR_TYPES):
+            return 1
+        if isinstance(first_arg, Sized):
+            return len(first_arg)
+    return 1
+
+
+def measure_performance(operation_name: str = None, enabled: bool = None):
     def decorator(func):
+        if not (_decoration_enabled if enabled is None else enabled):
+            return func
+
+        name = operation_name or func.__name__
+
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            if hasattr(self, 'analyzer'):
-                start_time = self.analyzer.start_operation(operation_name or func.__name__)
-
-                elements = 1
-                if args:
-                    first_arg = args[0]
-                    if isinstance(first_arg, (list, tuple, set, dict)):
-                        elements = len(first_arg)
-                    elif isinstance(first_arg, Iterable) and not isinstance(first_arg, str):
-                        elements = sum(1 for _ in first_arg)
+            analyzer = getattr(self, 'analyzer', None)
+            if analyzer is None or not _runtime_enabled or not analyzer.should_measure():
+                return func(self, *args, **kwargs)
 
+            start_time = analyzer.start_operation(name)
+            try:
                 result = func(self, *args, **kwargs)
-                self.analyzer.end_operation(
-                    operation_name or func.__name__,
-                    start_time,
-                    elements
-                )
-                return result
-            return func(self, *args, **kwargs)
+            except BaseException:
+                analyzer.discard_operation()
+                raise
+            analyzer.record_operation(
+                name,
+                start_time,
+                _count_elements(args)
+            )
+            return result
 
         return wrapper
 
-    return decorator
\ No newline at end of file
+    return decorator
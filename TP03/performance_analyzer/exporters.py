@@ -0,0 +1,177 @@
+import csv
+import json
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from .analyzer import PerformanceAnalyzer
+
+COLUMNS = ['operation', 'time_ns', 'elements', 'comparisons', 'memory_peak', 'memory_net']
+PROMETHEUS_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class _StreamingExporter(ABC):
+    """Base class for exporters that write one row per recorded operation.
+
+    Rows are written as operations finish, and the file is flushed every
+    ``flush_every`` rows, so the output can be tailed while the process runs.
+    Writes are serialized with the exporter's own lock, since analyzers
+    notify listeners from whichever thread recorded the operation.
+    """
+
+    def __init__(self, path: str, flush_every: int = 1000):
+        self.path = path
+        self.flush_every = flush_every
+        self._file = open(path, 'w', newline='')
+        self._pending = 0
+        self._analyzers = []
+        self._write_lock = threading.Lock()
+
+    def attach(self, analyzer: PerformanceAnalyzer) -> '_StreamingExporter':
+        analyzer.add_listener(self)
+        self._analyzers.append(analyzer)
+        return self
+
+    def __call__(self, operation: str, time_ns: int, elements: int, comparisons: int,
+                 memory_peak: int, memory_net: int, additional_metrics: Optional[Dict[str, Any]]) -> None:
+        with self._write_lock:
+            if self._file.closed:
+                # Notified from a snapshot taken just before close().
+                return
+            self._write(operation, time_ns, elements, comparisons, memory_peak, memory_net, additional_metrics)
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._file.flush()
+                self._pending = 0
+
+    @abstractmethod
+    def _write(self, operation, time_ns, elements, comparisons, memory_peak, memory_net, additional_metrics):
+        """Write one record to ``self._file``."""
+
+    def close(self) -> None:
+        for analyzer in self._analyzers:
+            analyzer.remove_listener(self)
+        self._analyzers = []
+        with self._write_lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CsvExporter(_StreamingExporter):
+
+    def __init__(self, path: str, flush_every: int = 1000):
+        super().__init__(path, flush_every)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def _write(self, operation, time_ns, elements, comparisons, memory_peak, memory_net, additional_metrics):
+        self._writer.writerow((operation, time_ns, elements, comparisons, memory_peak, memory_net))
+
+
+class JsonlExporter(_StreamingExporter):
+
+    def _write(self, operation, time_ns, elements, comparisons, memory_peak, memory_net, additional_metrics):
+        record = {
+            'operation': operation,
+            'time_ns': time_ns,
+            'elements': elements,
+            'comparisons': comparisons,
+            'memory_peak': memory_peak,
+            'memory_net': memory_net,
+        }
+        if additional_metrics:
+            record['additional_metrics'] = additional_metrics
+        self._file.write(json.dumps(record, default=str))
+        self._file.write('\n')
+
+
+def dump_columns(analyzer: PerformanceAnalyzer, path: str) -> None:
+    """Write the current history as a NumPy ``.npz`` archive, one array per column."""
+    import numpy as np
+
+    history = analyzer.metrics_history
+    slots = np.array(history.slots(), dtype=np.int64)
+    operation_ids = np.frombuffer(history.operation_id, dtype=np.int32)[slots]
+    np.savez(
+        path,
+        operation=np.array(history.operation_names, dtype=str)[operation_ids],
+        time_ns=np.frombuffer(history.time_ns, dtype=np.int64)[slots],
+        elements=np.frombuffer(history.elements, dtype=np.int64)[slots],
+        comparisons=np.frombuffer(history.comparisons, dtype=np.int64)[slots],
+        memory_peak=np.frombuffer(history.memory_peak, dtype=np.int64)[slots],
+        memory_net=np.frombuffer(history.memory_net, dtype=np.int64)[slots],
+    )
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(analyzers: Dict[str, PerformanceAnalyzer], prefix: str = 'perf') -> str:
+    """Render the streaming aggregates of each analyzer in Prometheus text format."""
+    families = {
+        'duration': (f'{prefix}_operation_duration_seconds', 'summary',
+                     'Operation latency in seconds.', []),
+        'comparisons': (f'{prefix}_operation_comparisons_total', 'counter',
+                        'Comparisons recorded by the operation.', []),
+        'elements': (f'{prefix}_operation_elements_total', 'counter',
+                     'Elements processed by the operation.', []),
+        'memory': (f'{prefix}_operation_memory_peak_bytes_max', 'gauge',
+                   'Largest peak allocation seen for the operation.', []),
+    }
+
+    for analyzer_name, analyzer in analyzers.items():
+        for stats in analyzer.operation_stats():
+            labels = f'analyzer="{_escape_label(analyzer_name)}",operation="{_escape_label(stats.operation)}"'
+            duration_name = families['duration'][0]
+            samples = families['duration'][3]
+            for quantile in PROMETHEUS_QUANTILES:
+                value = stats.percentile_ns(quantile * 100) / 1e9
+                samples.append(f'{duration_name}{{{labels},quantile="{quantile}"}} {value:.9f}')
+            samples.append(f'{duration_name}_sum{{{labels}}} {stats.total_time_ns / 1e9:.9f}')
+            samples.append(f'{duration_name}_count{{{labels}}} {stats.count}')
+
+            families['comparisons'][3].append(f'{families["comparisons"][0]}{{{labels}}} {stats.total_comparisons}')
+            families['elements'][3].append(f'{families["elements"][0]}{{{labels}}} {stats.total_elements}')
+            families['memory'][3].append(f'{families["memory"][0]}{{{labels}}} {stats.max_memory_peak}')
+
+    lines = []
+    for name, metric_type, help_text, samples in families.values():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        lines.extend(samples)
+    return '\n'.join(lines) + '\n'
+
+
+def start_prometheus_server(analyzers: Dict[str, PerformanceAnalyzer], port: int = 9100,
+                            host: str = '127.0.0.1', prefix: str = 'perf') -> ThreadingHTTPServer:
+    """Serve ``prometheus_text`` on ``/metrics`` from a daemon thread.
+
+    The endpoint has no authentication, so it only listens on loopback unless
+    ``host`` asks for a wider bind, e.g. ``'0.0.0.0'`` for every interface.
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = prometheus_text(analyzers, prefix).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
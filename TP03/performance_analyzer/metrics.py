@@ -10,6 +10,7 @@ class PerformanceMetrics:
     comparisons: int
     memory_used: float = 0.0 
     additional_metrics: Dict[str, Any] = None
+    memory_net: float = 0.0
 
     def __post_init__(self):
         if self.additional_metrics is None:
@@ -0,0 +1,89 @@
+from array import array
+from collections.abc import Sequence
+from typing import Any, Dict, List, Optional
+
+from .metrics import PerformanceMetrics
+
+
+class MetricsRingBuffer(Sequence):
+    """Fixed-capacity metrics history stored as preallocated columns.
+
+    Recording a metric writes into the columns in place; once ``capacity`` is
+    reached the oldest entries are overwritten. Indexing and iteration return
+    ``PerformanceMetrics`` objects built on demand, oldest first, so code that
+    treats ``metrics_history`` as a list keeps working.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.operation_names: List[str] = []
+        self._operation_ids: Dict[str, int] = {}
+        self.operation_id = array('i', bytes(4 * capacity))
+        self.time_ns = array('q', bytes(8 * capacity))
+        self.elements = array('q', bytes(8 * capacity))
+        self.comparisons = array('q', bytes(8 * capacity))
+        self.memory_peak = array('q', bytes(8 * capacity))
+        self.memory_net = array('q', bytes(8 * capacity))
+        self._additional: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._next = 0
+        self._size = 0
+        self.total_recorded = 0
+
+    def append(self, operation: str, time_ns: int, elements: int, comparisons: int,
+               additional_metrics: Dict[str, Any] = None,
+               memory_peak: int = 0, memory_net: int = 0) -> None:
+        operation_id = self._operation_ids.get(operation)
+        if operation_id is None:
+            operation_id = len(self.operation_names)
+            self._operation_ids[operation] = operation_id
+            self.operation_names.append(operation)
+
+        slot = self._next
+        self.operation_id[slot] = operation_id
+        self.time_ns[slot] = time_ns
+        self.elements[slot] = elements
+        self.comparisons[slot] = comparisons
+        self.memory_peak[slot] = memory_peak
+        self.memory_net[slot] = memory_net
+        self._additional[slot] = additional_metrics
+
+        self._next = slot + 1 if slot + 1 < self.capacity else 0
+        if self._size < self.capacity:
+            self._size += 1
+        self.total_recorded += 1
+
+    def clear(self) -> None:
+        self._next = 0
+        self._size = 0
+        self._additional = [None] * self.capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _slot(self, index: int) -> int:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("metrics history index out of range")
+        return (self._next - self._size + index) % self.capacity
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+
+        slot = self._slot(index)
+        return PerformanceMetrics(
+            operation=self.operation_names[self.operation_id[slot]],
+            time_taken=self.time_ns[slot] / 1e9,
+            elements_processed=self.elements[slot],
+            comparisons=self.comparisons[slot],
+            memory_used=self.memory_peak[slot],
+            additional_metrics=self._additional[slot],
+            memory_net=self.memory_net[slot]
+        )
+
+    def slots(self) -> List[int]:
+        start = self._next - self._size
+        return [(start + i) % self.capacity for i in range(self._size)]